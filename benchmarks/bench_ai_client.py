@@ -0,0 +1,68 @@
+"""Async grader client throughput against the in-process fake endpoint.
+
+Fires `--submissions` grading calls for one assignment at once and reports
+wall time, throughput, HTTP requests made and peak requests in flight for
+each concurrency / batch size / rate limit combination.
+
+    python -m benchmarks.bench_ai_client --submissions 200 --concurrency 1 8 32 --batch 1 8
+    python -m benchmarks.bench_ai_client --rate 20 --burst 5
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks import common
+from benchmarks.fake_ai import app, meter
+from services.ai_client import ChatClient
+from services.ai_grader import GradeBatcher
+
+
+async def run_once(submissions, concurrency, batch_size, rate, burst):
+    meter.reset()
+    client = ChatClient(
+        "http://fake-ai/v1", "test-key", "fake-model",
+        concurrency=concurrency, rate_per_second=rate, burst=burst,
+        transport=httpx.ASGITransport(app=app),
+    )
+    batcher = GradeBatcher(client, batch_size, 0.02)
+
+    async def one(i):
+        started = time.perf_counter()
+        await batcher.grade("Giải thích định luật Ohm", f"Bài làm số {i}")
+        return time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(one(i) for i in range(submissions)))
+        wall = time.perf_counter() - started
+    finally:
+        await client.aclose()
+
+    print(f"concurrency={concurrency:<3} batch={batch_size:<3} rate={rate or '-':<4} "
+          f"wall={wall:.2f}s  throughput={submissions / wall:.1f} grades/s  "
+          f"requests={meter.requests}  peak in flight={meter.peak}  "
+          f"p95={common.percentile(samples, 95) * 1000:.0f}ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--rate", type=float, default=0, help="requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=None, help="fake endpoint latency in seconds")
+    args = parser.parse_args()
+
+    if args.latency is not None:
+        meter.latency = args.latency
+    print(f"submissions={args.submissions} endpoint latency={meter.latency * 1000:.0f}ms")
+    for batch_size in args.batch:
+        for concurrency in args.concurrency:
+            asyncio.run(run_once(args.submissions, concurrency, batch_size, args.rate, args.burst))
+
+
+if __name__ == "__main__":
+    main_cli()
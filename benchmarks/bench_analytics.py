@@ -0,0 +1,110 @@
+"""Academic statistics engine on millions of score rows.
+
+Builds synthetic quiz, assignment and payment tables (`--rows` score rows
+spread over `--courses` courses, `--teachers` teachers and 24 months),
+times `services.analytics.build_report` and checks its percentiles, means
+and pass rates against a plain per-group NumPy loop. `--db-rows` also seeds
+that many quiz submissions into the benchmark database and times the load
+queries behind GET /manager/reports.
+
+    python -m benchmarks.bench_analytics --rows 1000000 3000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks import common
+
+import models
+from database import SessionLocal
+from services import analytics
+
+
+def synthetic(rows, courses, teachers, rng):
+    course = rng.integers(1, courses + 1, rows)
+    return analytics.FactTable(
+        course,
+        course % teachers + 1,
+        np.round(np.clip(rng.normal(6 + course % 3, 2, rows), 0, 10), 2),
+        rng.integers(2024 * 12, 2026 * 12, rows),
+    )
+
+
+def names(courses, teachers):
+    return (
+        {i: (f"Khóa {i}", i % teachers + 1) for i in range(1, courses + 1)},
+        {i: f"Giáo viên {i}" for i in range(1, teachers + 1)},
+    )
+
+
+def verify(table, pass_mark):
+    stats = analytics.group_stats(table.course, table.value).rows()
+    for key in np.unique(table.course)[:20].tolist():
+        values = table.value[table.course == key]
+        row = stats[key]
+        assert row["count"] == len(values)
+        assert np.isclose(row["mean"], values.mean())
+        assert np.isclose(row["pass_rate"], (values >= pass_mark).mean() * 100)
+        for p in analytics.PERCENTILES:
+            assert np.isclose(row["percentiles"][p], np.percentile(values, p)), (key, p)
+        assert sum(row["histogram"]) == len(values)
+
+
+def bench_compute(rows, courses, teachers, rounds):
+    rng = np.random.default_rng(7)
+    quizzes = synthetic(rows * 2 // 3, courses, teachers, rng)
+    assignments = synthetic(rows // 3, courses, teachers, rng)
+    payments = synthetic(rows // 10, courses, teachers, rng)
+    course_names, teacher_names = names(courses, teachers)
+    verify(quizzes, analytics.config.ANALYTICS_PASS_MARK)
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        analytics.build_report(quizzes, assignments, payments, course_names, teacher_names)
+        samples.append(time.perf_counter() - started)
+    best = min(samples)
+    print(f"{rows:>10} score rows  build_report best {best * 1000:8.1f} ms  "
+          f"({rows / best / 1e6:5.1f} M rows/s)  {'OK' if best < 1 else 'SLOW'}")
+
+
+def bench_load(db_rows):
+    common.reset_schema()
+    common.seed_classroom(students=50)
+    db = SessionLocal()
+    try:
+        rng = np.random.default_rng(3)
+        scores = np.round(rng.uniform(0, 10, db_rows), 2).tolist()
+        db.execute(models.QuizSubmission.__table__.insert(), [
+            {"quiz_id": 1, "student_id": 100 + i % 50, "score": score} for i, score in enumerate(scores)
+        ])
+        db.commit()
+
+        started = time.perf_counter()
+        analytics.invalidate_report()
+        report = analytics.get_report(db)
+        elapsed = time.perf_counter() - started
+        print(f"{db_rows:>10} quiz rows in SQLite  get_report (load + compute) {elapsed * 1000:8.1f} ms  "
+              f"compute {report['compute_seconds'] * 1000:.1f} ms")
+    finally:
+        db.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--teachers", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--db-rows", type=int, default=0)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        bench_compute(rows, args.courses, args.teachers, args.rounds)
+    if args.db_rows:
+        bench_load(args.db_rows)
+
+
+if __name__ == "__main__":
+    main_cli()
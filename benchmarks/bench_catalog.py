@@ -0,0 +1,83 @@
+"""Course catalog page and search API as the number of courses grows.
+
+Seeds `--courses` active courses (the student owns every tenth one) and
+reports the median latency and SQL statements of GET /student/courses and
+GET /student/courses/search with a warm catalog, plus the cold rebuild
+that follows a course change.
+
+    python -m benchmarks.bench_catalog --courses 100 1000 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks import common
+
+import main
+import models
+from database import SessionLocal
+from services.catalog import invalidate_catalog
+from services.query_counter import QueryCounter
+
+
+def seed_courses(count):
+    db = SessionLocal()
+    try:
+        db.add_all(
+            models.Course(title=f"Khóa {i} Vật lý" if i % 3 else f"Khóa {i} Toán", description="IGCSE",
+                          price=50 + i % 200, teacher_id=2, status="active")
+            for i in range(count)
+        )
+        db.flush()
+        ids = [row[0] for row in db.query(models.Course.course_id).filter(models.Course.course_id > 1)]
+        db.add_all(models.Payment(student_id=100, course_id=cid, amount=1, status="paid") for cid in ids[::10])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def measure(client, url, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        resp = await client.get(url)
+        samples.append(time.perf_counter() - started)
+        assert resp.status_code == 200, resp.text
+    with QueryCounter() as counter:
+        await client.get(url)
+    return statistics.median(samples), counter.count
+
+
+async def run(course_counts, rounds):
+    for count in course_counts:
+        common.reset_schema()
+        common.seed_classroom(students=1)
+        seed_courses(count)
+        invalidate_catalog()
+        client = await common.login(common.make_client(main.app), "student0@bench.local")
+        try:
+            invalidate_catalog()
+            started = time.perf_counter()
+            await client.get("/student/courses")
+            cold = time.perf_counter() - started
+
+            page, page_statements = await measure(client, "/student/courses", rounds)
+            search, search_statements = await measure(client, "/student/courses/search?q=toan&max_price=150", rounds)
+        finally:
+            await client.aclose()
+        print(f"courses={count:<6} cold page={cold * 1000:7.1f}ms  "
+              f"page={page * 1000:7.1f}ms ({page_statements} stmts)  "
+              f"search={search * 1000:6.1f}ms ({search_statements} stmts)")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.courses, args.rounds))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,89 @@
+"""Checks that slow queries in one request no longer block other requests.
+
+Every SQL statement gets an artificial delay. N concurrent requests to a hot
+read route should then finish in far less than N times the single-request
+time, and a cheap probe request (GET /login) must keep answering while the
+burst is in flight. Write routes on SQLite still queue on the database file
+lock, so for those only the probe latency is checked.
+
+    python -m benchmarks.bench_concurrency --requests 20 --latency 0.02
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks import common
+
+import main
+
+
+ROUTES = [
+    ("student_dashboard", "student", "GET", "/student/", None, False),
+    ("grading_list", "teacher", "GET", "/teacher/grading", None, False),
+    ("submit_quiz", "student", "POST", "/student/quiz/submit/1", {"q_1": "B", "q_2": "C"}, True),
+]
+
+
+async def _timed(client, method, url, data):
+    started = time.perf_counter()
+    resp = await client.request(method, url, data=data)
+    assert resp.status_code in (200, 302), f"{method} {url} -> {resp.status_code}"
+    return time.perf_counter() - started
+
+
+async def _probe(client, stop, samples):
+    while not stop.is_set():
+        samples.append(await _timed(client, "GET", "/login", None))
+        await asyncio.sleep(0.005)
+
+
+async def run(requests, latency, min_speedup):
+    common.reset_schema()
+    emails = common.seed_classroom(students=requests)
+
+    students = [await common.login(common.make_client(main.app), email) for email in emails]
+    teacher = await common.login(common.make_client(main.app), "teacher@bench.local")
+    probe = common.make_client(main.app)
+
+    remove_latency = common.add_statement_latency(latency)
+    failed = False
+    try:
+        for name, role, method, url, data, writes in ROUTES:
+            clients = students if role == "student" else [teacher] * requests
+
+            single = await _timed(clients[0], method, url, data)
+
+            stop, probe_samples = asyncio.Event(), []
+            probe_task = asyncio.create_task(_probe(probe, stop, probe_samples))
+            started = time.perf_counter()
+            await asyncio.gather(*(_timed(c, method, url, data) for c in clients))
+            wall = time.perf_counter() - started
+            stop.set()
+            await probe_task
+
+            speedup = single * requests / wall
+            probe_max = max(probe_samples, default=0.0)
+            ok = probe_max < single and (writes or speedup >= min_speedup)
+            failed = failed or not ok
+            print(f"{name:<20} single={single * 1000:7.1f}ms  {requests} concurrent={wall * 1000:8.1f}ms  "
+                  f"speedup={speedup:5.1f}x  probe max={probe_max * 1000:6.1f}ms  {'OK' if ok else 'SERIALIZED'}")
+    finally:
+        remove_latency()
+        for client in students + [teacher, probe]:
+            await client.aclose()
+    return not failed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every SQL statement")
+    parser.add_argument("--min-speedup", type=float, default=3.0)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.requests, args.latency, args.min_speedup))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
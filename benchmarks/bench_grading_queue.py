@@ -0,0 +1,107 @@
+"""AI grading queue throughput with the deterministic stub grader.
+
+Enqueues one grading job per submission, then drains the queue with
+`GradingWorker` at each requested concurrency. `--delay` simulates the
+model round trip and `--fail-rate` makes that share of first attempts
+raise, to exercise the retry path. `--distinct` limits how many different
+answers the class writes, so the grading cache can be measured; the cache
+is emptied before each run.
+
+    python -m benchmarks.bench_grading_queue --submissions 200 --delay 0.2 --concurrency 1 4 16
+    python -m benchmarks.bench_grading_queue --submissions 200 --distinct 20 --concurrency 4
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func
+
+from benchmarks import common
+
+import config
+import models
+from database import SessionLocal
+from services.ai_grader import grade_submission_stub
+from services import grading_cache
+from services.grading_queue import GradingWorker, enqueue
+
+
+def flaky(fail_rate, delay):
+    seen = set()
+
+    def grader(question, answer):
+        time.sleep(delay)
+        key = (question, answer)
+        if key not in seen and hash(key) % 100 < fail_rate * 100:
+            seen.add(key)
+            raise RuntimeError("simulated grader timeout")
+        seen.add(key)
+        return grade_submission_stub(question, answer)
+    return grader
+
+
+def enqueue_all():
+    db = SessionLocal()
+    try:
+        db.query(models.GradingCache).delete()
+        ids = [row[0] for row in db.query(models.Submission.submission_id).all()]
+        for submission_id in ids:
+            enqueue(db, submission_id)
+        db.commit()
+        return len(ids)
+    finally:
+        db.close()
+
+
+def job_counts():
+    db = SessionLocal()
+    try:
+        return dict(db.query(models.GradingJob.status, func.count()).group_by(models.GradingJob.status).all())
+    finally:
+        db.close()
+
+
+def limit_answers(distinct):
+    db = SessionLocal()
+    try:
+        for i, submission in enumerate(db.query(models.Submission).order_by(models.Submission.submission_id)):
+            submission.answer = f"Answer {i % distinct}"
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(submissions, concurrencies, delay, fail_rate, distinct):
+    config.GRADING_RETRY_BASE_SECONDS = 0
+    common.reset_schema()
+    common.seed_classroom(students=submissions, questions=1, with_history=True)
+    if distinct:
+        limit_answers(distinct)
+
+    print(f"submissions={submissions} distinct answers={distinct or submissions} "
+          f"grader delay={delay * 1000:.0f}ms fail-rate={fail_rate:.0%}")
+    for concurrency in concurrencies:
+        total = enqueue_all()
+        grading_cache.stats.reset()
+        worker = GradingWorker(concurrency=concurrency, grader=flaky(fail_rate, delay), poll_seconds=0.01)
+        started = time.perf_counter()
+        asyncio.run(worker.run(stop_when_idle=True))
+        wall = time.perf_counter() - started
+        print(f"concurrency={concurrency:<3} wall={wall:.2f}s  throughput={total / wall:.1f} jobs/s  "
+              f"retries={worker.failed}  cache hits={grading_cache.stats.hits} misses={grading_cache.stats.misses}  "
+              f"jobs={job_counts()}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds the stub grader sleeps per job")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="share of first attempts that raise")
+    parser.add_argument("--distinct", type=int, default=0, help="number of different answers (0 = all unique)")
+    args = parser.parse_args()
+    run(args.submissions, args.concurrency, args.delay, args.fail_rate, args.distinct)
+
+
+if __name__ == "__main__":
+    main_cli()
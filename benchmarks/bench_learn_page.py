@@ -0,0 +1,95 @@
+"""Course learning page: full render, cached fragment and 304 revalidation.
+
+Seeds course 1 with `--lessons` lessons of `--kb` kilobytes of HTML each and
+reports the median latency, SQL statements and size of GET /student/learn/1
+when the course content is rendered from scratch, when it comes from the
+fragment cache, and when the browser revalidates with its ETag, followed by
+fetching one lesson body from GET /student/lesson/{id}. `--gzip` stores the
+bodies compressed and requests them with `Accept-Encoding: gzip`.
+
+    python -m benchmarks.bench_learn_page --lessons 10 50 200 [--gzip]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks import common
+
+import config
+import main
+import models
+from database import SessionLocal
+from services import lesson_content
+from services.course_content import invalidate_content
+from services.query_counter import QueryCounter
+
+URL = "/student/learn/1"
+
+
+def seed_lessons(count, kb):
+    paragraph = "<p>" + "Lorem ipsum dolor sit amet, IGCSE physics notes. " * 20 + "</p>\n"
+    content = paragraph * max(1, kb * 1024 // len(paragraph))
+    db = SessionLocal()
+    try:
+        for i in range(count):
+            lesson = models.Lesson(title=f"Bài {i}", course_id=1)
+            lesson_content.set_content(lesson, content)
+            db.add(lesson)
+        db.commit()
+        return db.query(models.Lesson.lesson_id).filter(models.Lesson.title == "Bài 0").scalar()
+    finally:
+        db.close()
+
+
+async def measure(client, rounds, url=URL, headers=None, before=None, status=200):
+    samples = []
+    for _ in range(rounds):
+        if before:
+            before()
+        started = time.perf_counter()
+        resp = await client.get(url, headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert resp.status_code == status, resp.status_code
+    if before:
+        before()
+    with QueryCounter() as counter:
+        await client.get(url, headers=headers)
+    return statistics.median(samples) * 1000, counter.count, int(resp.headers.get("content-length", len(resp.content)))
+
+
+async def run(lesson_counts, kb, rounds, compress):
+    config.LESSON_GZIP = compress
+    lesson_headers = {"Accept-Encoding": "gzip"} if compress else {"Accept-Encoding": "identity"}
+    for count in lesson_counts:
+        common.reset_schema()
+        common.seed_classroom(students=1)
+        lesson_id = seed_lessons(count, kb)
+        invalidate_content()
+        client = await common.login(common.make_client(main.app), "student0@bench.local")
+        try:
+            full = await measure(client, rounds, before=invalidate_content)
+            cached = await measure(client, rounds)
+            etag = (await client.get(URL)).headers["etag"]
+            revalidated = await measure(client, rounds, headers={"If-None-Match": etag}, status=304)
+            lesson = await measure(client, rounds, url=f"/student/lesson/{lesson_id}", headers=lesson_headers)
+        finally:
+            await client.aclose()
+        print(f"lessons={count:<5} " + "  ".join(
+            f"{label} {ms:7.2f} ms ({statements} stmts, {size // 1024} KB)"
+            for label, (ms, statements, size) in (("render", full), ("fragment", cached), ("304", revalidated), ("lesson", lesson))
+        ))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lessons", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--kb", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.lessons, args.kb, args.rounds, args.gzip))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,300 @@
+"""End-to-end load benchmark over every route, with a JSON baseline.
+
+Generates a `benchmarks.datagen` dataset (or reuses the one already in
+DATABASE_URL with `--reuse`), logs in one client per role and drives every
+route of the app through the ASGI transport: each GET route, plus the
+repeatable form posts, with path parameters taken from the well-known
+accounts' own courses, lessons, quizzes and submissions. Routes that
+destroy data or end the session are listed as skipped. For each route it
+reports p50/p95/p99 latency, throughput at `--concurrency` and SQL
+statements per request.
+
+`--output` writes the results as JSON. `--compare` diffs a run against a
+stored baseline and fails when a route issues more statements per request
+than before (beyond `STATEMENT_SLACK`), or its median latency grew by more than
+`--tolerance` (and by at least `--min-ms`).
+
+    python -m benchmarks.bench_load --scale tiny --output benchmarks/load_baseline.json
+    python -m benchmarks.bench_load --scale tiny --compare benchmarks/load_baseline.json
+    DATABASE_URL=sqlite:///load.db python -m benchmarks.bench_load --scale large --reuse --requests 200
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import re
+import sys
+import time
+
+import sqlalchemy
+from sqlalchemy import func
+
+from benchmarks import common, datagen
+
+import main
+import models
+from database import SessionLocal
+from services.query_counter import QueryCounter
+
+ACCOUNTS = {
+    "student": "student0@load.local",
+    "teacher": "teacher0@load.local",
+    "admin": "admin@load.local",
+    "manager": "manager@load.local",
+    "parent": "parent0@load.local",
+}
+
+ROLE_PREFIXES = {"/student": "student", "/teacher": "teacher", "/admin": "admin", "/manager": "manager",
+                 "/parent": "parent", "/profile": "student"}
+
+QUERY_STRINGS = {
+    "/student/courses/search": "?q=toan&max_price=200",
+    "/admin/students/search": "?q=student1",
+    "/admin/financials/report": "?start=2020-01-01",
+}
+
+EXTRA_GETS = [
+    ("teacher", "/teacher/grading?tab=graded"),
+    ("admin", "/admin/users?search=student1"),
+]
+
+SKIPPED = {
+    ("GET", "/logout"): "ends the session",
+    ("POST", "/reset-password"): "changes a password",
+    ("POST", "/admin/users/role"): "changes a role",
+    ("POST", "/admin/users/delete"): "deletes a user",
+    ("POST", "/teacher/lesson/delete"): "deletes content",
+    ("POST", "/teacher/quiz/delete"): "deletes content",
+    ("POST", "/teacher/assignment/delete"): "deletes content",
+}
+
+DOC_PATHS = ("/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc")
+
+HEAVY_REQUESTS = 3
+
+# writes that take a slower path on first use (first attempt, first purchase)
+# average a fractional statement count that shifts with request interleaving
+STATEMENT_SLACK = 0.5
+
+
+def resolve_ids(db):
+    student = db.query(models.User.user_id).filter(models.User.email == ACCOUNTS["student"]).scalar()
+    teacher = db.query(models.User.user_id).filter(models.User.email == ACCOUNTS["teacher"]).scalar()
+    parent = db.query(models.User.user_id).filter(models.User.email == ACCOUNTS["parent"]).scalar()
+    course_id = db.query(models.Course.course_id).join(
+        models.Payment, models.Payment.course_id == models.Course.course_id
+    ).filter(
+        models.Payment.student_id == student, models.Payment.status == "paid", models.Course.teacher_id == teacher
+    ).order_by(models.Course.course_id).limit(1).scalar()
+    quiz_id = db.query(func.min(models.Quiz.quiz_id)).filter(models.Quiz.course_id == course_id).scalar()
+    return {
+        "course_id": course_id,
+        "lesson_id": db.query(func.min(models.Lesson.lesson_id)).filter(models.Lesson.course_id == course_id).scalar(),
+        "quiz_id": quiz_id,
+        "assign_id": db.query(func.min(models.Assignment.assignment_id)).filter(models.Assignment.course_id == course_id).scalar(),
+        "submission_id": db.query(func.max(models.QuizSubmission.submission_id)).filter(
+            models.QuizSubmission.student_id == student).scalar(),
+        "student_id": db.query(func.min(models.parent_student_association.c.student_id)).filter(
+            models.parent_student_association.c.parent_id == parent).scalar(),
+        "question_ids": [row[0] for row in db.query(models.Question.question_id).filter(models.Question.quiz_id == quiz_id)],
+        "essay_id": db.query(func.max(models.Submission.submission_id)).join(
+            models.Assignment, models.Assignment.assignment_id == models.Submission.assignment_id
+        ).filter(models.Assignment.course_id == course_id).scalar(),
+        "unowned_course_id": db.query(func.max(models.Course.course_id)).filter(
+            ~models.Course.course_id.in_(db.query(models.Payment.course_id).filter(models.Payment.student_id == student))
+        ).scalar(),
+        "teacher_id": teacher,
+    }
+
+
+def form_posts(ids):
+    quiz_answers = {f"q_{question_id}": "ABCD"[question_id % 4] for question_id in ids["question_ids"]}
+    return [
+        ("anonymous", "/login", lambda i: {"email": ACCOUNTS["student"], "password": common.PASSWORD}, None),
+        ("anonymous", "/register", lambda i: {"fullname": f"Load {i}", "email": f"load{time.time_ns()}_{i}@load.local",
+                                              "password": common.PASSWORD, "confirm_password": common.PASSWORD}, None),
+        ("anonymous", "/forgot-password", lambda i: {"email": ACCOUNTS["parent"]}, None),
+        ("student", f"/student/lesson/{ids['lesson_id']}/view", None, None),
+        ("student", f"/student/quiz/submit/{ids['quiz_id']}", lambda i: quiz_answers, None),
+        ("student", "/student/assignment/submit", lambda i: {"assignment_id": ids["assign_id"], "answer": f"Bài làm tải {i}"}, None),
+        ("student", "/student/course/buy", lambda i: {"course_id": ids["unowned_course_id"]}, None),
+        ("student", "/profile/update", lambda i: {"fullname": "Học sinh 0"}, None),
+        ("teacher", "/teacher/grading/update", lambda i: {"submission_id": ids["essay_id"], "teacher_score": 8,
+                                                          "feedback": "Đã chấm"}, None),
+        ("teacher", "/teacher/grading/retry", lambda i: {"submission_id": ids["essay_id"]}, None),
+        ("teacher", "/teacher/announcement/send", lambda i: {"course_id": ids["course_id"], "message": f"Thông báo {i}"}, HEAVY_REQUESTS),
+        ("teacher", "/teacher/lesson/add", lambda i: {"course_id": ids["course_id"], "title": f"Bài thêm {i}",
+                                                      "content": "<p>Nội dung</p>"}, None),
+        ("teacher", "/teacher/quiz/add", lambda i: {"course_id": ids["course_id"], "title": f"Quiz thêm {i}", "duration": 10}, None),
+        ("teacher", "/teacher/assignment/add", lambda i: {"course_id": ids["course_id"], "title": f"Tự luận thêm {i}",
+                                                          "max_score": 10, "content": "Đề bài"}, None),
+        ("teacher", "/teacher/quiz/question/add", lambda i: {"quiz_id": ids["quiz_id"], "content": f"Câu thêm {i}",
+                                                             "option_a": "A", "option_b": "B", "option_c": "C",
+                                                             "option_d": "D", "correct_answer": "A"}, None),
+        ("manager", "/manager/send_warning", lambda i: {"teacher_id": ids["teacher_id"], "course_title": "IGCSE",
+                                                        "reason": "Tỷ lệ hoàn thành thấp"}, None),
+        ("manager", "/manager/courses/add", lambda i: {"title": f"Khóa mới {i}", "description": "Tải thử", "price": 99,
+                                                       "teacher_id": ids["teacher_id"]}, None),
+        ("admin", "/admin/financials/rebuild", lambda i: {}, HEAVY_REQUESTS),
+    ]
+
+
+def scenarios(ids):
+    plan = []
+    for route in main.app.routes:
+        if "GET" not in (getattr(route, "methods", None) or ()) or route.path in DOC_PATHS or ("GET", route.path) in SKIPPED:
+            continue
+        role = next((r for prefix, r in ROLE_PREFIXES.items() if route.path.startswith(prefix)), "anonymous")
+        url = re.sub(r"{(\w+)}", lambda match: str(ids[match.group(1)]), route.path) + QUERY_STRINGS.get(route.path, "")
+        plan.append((role, "GET", url, None, None))
+    plan.extend((role, "GET", url, None, None) for role, url in EXTRA_GETS)
+    plan.extend((role, "POST", url, form, requests) for role, url, form, requests in form_posts(ids))
+
+    driven = {(method, url.split("?")[0]) for _role, method, url, _form, _requests in plan}
+    missing = [
+        f"{method} {route.path}"
+        for route in main.app.routes if route.path not in DOC_PATHS
+        for method in sorted(getattr(route, "methods", None) or ()) if method in ("GET", "POST")
+        if (method, route.path) not in SKIPPED
+        and not any(m == method and route.path_regex.match(path) for m, path in driven)
+    ]
+    return plan, missing
+
+
+async def drive(client, method, url, form, requests, concurrency):
+    latencies, statuses = [], {}
+    counter = itertools.count()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        i = next(counter)
+        async with semaphore:
+            started = time.perf_counter()
+            if method == "GET":
+                resp = await client.get(url)
+            else:
+                resp = await client.post(url, data=form(i) if form else None)
+            latencies.append((time.perf_counter() - started) * 1000)
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    with QueryCounter() as queries:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "p50_ms": round(common.percentile(latencies, 50), 2),
+        "p95_ms": round(common.percentile(latencies, 95), 2),
+        "p99_ms": round(common.percentile(latencies, 99), 2),
+        "rps": round(requests / elapsed, 1),
+        "statements": round(queries.count / requests, 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run(args):
+    if not args.reuse:
+        common.reset_schema()
+        datagen.generate(args.scale, seed=args.seed, log=lambda line: None)
+    db = SessionLocal()
+    try:
+        ids = resolve_ids(db)
+        counts = {table.name: db.query(func.count()).select_from(table).scalar() for table in models.Base.metadata.sorted_tables}
+    finally:
+        db.close()
+
+    clients = {"anonymous": common.make_client(main.app)}
+    for role, email in ACCOUNTS.items():
+        clients[role] = await common.login(common.make_client(main.app), email)
+
+    plan, missing = scenarios(ids)
+    results = {}
+    try:
+        for role, method, url, form, requests in plan:
+            label = f"{method} {url}"
+            if args.routes and not any(part in label for part in args.routes):
+                continue
+            client = clients[role]
+            if method == "GET":
+                await client.get(url)
+            result = await drive(client, method, url, form, requests or args.requests, args.concurrency)
+            results[label] = result
+            errors = sum(count for code, count in result["statuses"].items() if int(code) >= 400)
+            print(f"{label:<44} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  "
+                  f"{result['rps']:8.1f} req/s  {result['statements']:6.2f} stmts"
+                  + (f"  ({errors} errors)" if errors else ""))
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+    for (method, path), reason in sorted(SKIPPED.items()):
+        print(f"skipped {method} {path}: {reason}")
+    for label in missing:
+        print(f"not covered {label}")
+
+    return {
+        "meta": {
+            "scale": "reused" if args.reuse else args.scale,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "rows": counts,
+        },
+        "routes": results,
+    }
+
+
+def compare(current, baseline, tolerance, min_ms):
+    regressions = 0
+    old_routes = baseline.get("routes", {})
+    for label, new in current["routes"].items():
+        old = old_routes.get(label)
+        if old is None:
+            print(f"new     {label}")
+            continue
+        notes = []
+        if new["statements"] > old["statements"] + STATEMENT_SLACK:
+            notes.append(f"statements {old['statements']} -> {new['statements']}")
+        if new["p50_ms"] > old["p50_ms"] * (1 + tolerance) and new["p50_ms"] - old["p50_ms"] >= min_ms:
+            notes.append(f"p50 {old['p50_ms']} -> {new['p50_ms']} ms")
+        if notes:
+            regressions += 1
+            print(f"SLOWER  {label}: {'; '.join(notes)}")
+        elif new["statements"] < old["statements"] - STATEMENT_SLACK or new["p50_ms"] < old["p50_ms"] / (1 + tolerance):
+            print(f"faster  {label}: statements {old['statements']} -> {new['statements']}, p50 {old['p50_ms']} -> {new['p50_ms']} ms")
+    for label in sorted(set(old_routes) - set(current["routes"])):
+        print(f"gone    {label}")
+    print(f"{regressions} regression(s) against the baseline")
+    return regressions == 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(datagen.SCALES), default="tiny")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reuse", action="store_true", help="keep the dataset already in DATABASE_URL")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--routes", nargs="*", help="only routes whose label contains one of these")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    parser.add_argument("--min-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    current = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(current, fh, indent=2, sort_keys=True, ensure_ascii=False)
+            fh.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        sys.exit(0 if compare(current, baseline, args.tolerance, args.min_ms) else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
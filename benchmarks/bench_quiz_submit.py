@@ -0,0 +1,63 @@
+"""Whole-class quiz submission burst: every student submits the same quiz at once.
+
+Reports p50/p95/p99 latency of POST /student/quiz/submit and the SQL
+statements one submission costs.
+
+    python -m benchmarks.bench_quiz_submit --students 200 --questions 40
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import common
+
+import main
+from services.query_counter import QueryCounter
+
+
+async def _submit(client, form):
+    started = time.perf_counter()
+    resp = await client.post("/student/quiz/submit/1", data=form)
+    assert resp.status_code == 302, resp.text
+    return time.perf_counter() - started
+
+
+async def run(students, questions, latency):
+    common.reset_schema()
+    emails = common.seed_classroom(students=students, questions=questions)
+    clients = [await common.login(common.make_client(main.app), email) for email in emails]
+    question_ids = range(1, questions + 1)
+    form = {f"q_{qid}": "ABCD"[qid % 4] for qid in question_ids}
+
+    remove_latency = common.add_statement_latency(latency) if latency else (lambda: None)
+    try:
+        with QueryCounter() as counter:
+            await _submit(clients[0], form)
+        single_statements = counter.count
+
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(_submit(c, form) for c in clients))
+        wall = time.perf_counter() - started
+    finally:
+        remove_latency()
+        for client in clients:
+            await client.aclose()
+
+    print(f"students={students} questions={questions} latency/stmt={latency * 1000:.1f}ms")
+    print(f"statements per submission: {single_statements}")
+    print(f"burst wall time: {wall * 1000:.1f}ms  throughput: {students / wall:.1f} submissions/s")
+    for pct in (50, 95, 99):
+        print(f"p{pct}: {common.percentile(samples, pct) * 1000:.1f}ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every SQL statement")
+    args = parser.parse_args()
+    asyncio.run(run(args.students, args.questions, args.latency))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,74 @@
+"""Cold start of the web app in a fresh interpreter.
+
+Each run starts a new Python process against an empty SQLite database and
+measures importing `main` (which must not touch the database), then the
+lifespan startup (optional DDL, pool warm-up, template precompile). Fails
+when importing opened the database or when the median total exceeds
+`--budget-ms`.
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 2000
+    python -m benchmarks.bench_startup --create-schema
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import ROOT
+
+PROBE = """
+import asyncio, json, os, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+touched = os.path.exists(os.environ["BENCH_DB_PATH"])
+
+async def lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(lifespan())
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000, "touched": touched}))
+"""
+
+
+def run_once(create_schema):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="igcse_startup_"), "startup.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", BENCH_DB_PATH=db_path,
+               DB_CREATE_SCHEMA="1" if create_schema else "0")
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run(runs, create_schema, budget_ms):
+    results = [run_once(create_schema) for _ in range(runs)]
+    medians = {key: statistics.median(r[key] for r in results) for key in ("import_ms", "startup_ms", "total_ms")}
+    touched = any(r["touched"] for r in results)
+    print(f"{runs} runs{' with DB_CREATE_SCHEMA=1' if create_schema else ''}: "
+          f"import {medians['import_ms']:7.1f} ms  startup {medians['startup_ms']:7.1f} ms  "
+          f"process {medians['total_ms']:7.1f} ms  (budget {budget_ms} ms)")
+    if touched:
+        print("FAIL importing main opened the database")
+    if medians["total_ms"] > budget_ms:
+        print("FAIL cold start is over budget")
+    return not touched and medians["total_ms"] <= budget_ms
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000)
+    parser.add_argument("--create-schema", action="store_true")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.runs, args.create_schema, args.budget_ms) else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
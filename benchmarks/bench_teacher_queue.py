@@ -0,0 +1,108 @@
+"""Per-teacher grading queue as total submission volume grows.
+
+Seeds `--teachers` teachers with one course and assignment each, then
+`--submissions` essay submissions spread over all of them (about a tenth
+still pending). For the bench teacher it reports the median latency of
+the pending count and of the first queue page, next to the old
+table-wide `teacher_score IS NULL` count, and prints the query plan of
+the queue page so the composite index shows up.
+
+    python -m benchmarks.bench_teacher_queue --submissions 10000 100000 300000
+"""
+import argparse
+import datetime
+import statistics
+import time
+
+from benchmarks import common
+
+import models
+from database import SessionLocal, engine
+from services import grading_status
+from services.pagination import keyset_page
+
+
+def seed_submissions(teachers, total):
+    db = SessionLocal()
+    try:
+        for i in range(teachers):
+            user_id = 1000 + i
+            db.add(models.User(user_id=user_id, fullname=f"Teacher {i}", email=f"t{i}@bench.local", password_hash="x", role="teacher"))
+            db.flush()
+            db.add(models.Teacher(teacher_id=user_id, teacher_code=f"GV{user_id}"))
+            db.add(models.Course(course_id=1000 + i, title=f"Course {i}", teacher_id=user_id, status="active"))
+            db.add(models.Assignment(assignment_id=1000 + i, title=f"Essay {i}", max_score=10, course_id=1000 + i))
+        db.commit()
+
+        assignments = [1] + [1000 + i for i in range(teachers)]
+        now = datetime.datetime.utcnow()
+        rows = []
+        for n in range(total):
+            pending = n % 10 == 0
+            rows.append({
+                "assignment_id": assignments[n % len(assignments)],
+                "student_id": 100 + n % 50,
+                "answer": "essay",
+                "teacher_score": None if pending else 7,
+                "grading_status": grading_status.PENDING if pending else grading_status.AI_GRADED,
+                "submitted_at": now - datetime.timedelta(seconds=n),
+            })
+            if len(rows) == 20000:
+                db.execute(models.Submission.__table__.insert(), rows)
+                rows = []
+        if rows:
+            db.execute(models.Submission.__table__.insert(), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def median_ms(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def query_plan(query):
+    if engine.dialect.name != "sqlite":
+        return []
+    statement = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}")]
+
+
+def run(sizes, teachers, rounds):
+    for total in sizes:
+        common.reset_schema()
+        common.seed_classroom(students=50)
+        seed_submissions(teachers, total)
+        db = SessionLocal()
+        try:
+            queue = grading_status.teacher_submissions(db, 2, grading_status.PENDING)
+            columns = [models.Submission.submitted_at, models.Submission.submission_id]
+            count_ms = median_ms(lambda: grading_status.pending_count(db, 2), rounds)
+            page_ms = median_ms(lambda: keyset_page(queue, columns, None, 20, descending=False), rounds)
+            old_ms = median_ms(lambda: db.query(models.Submission).filter(models.Submission.teacher_score == None).count(), rounds)
+            print(f"{total:>8} submissions  pending {grading_status.pending_count(db, 2):>6}  "
+                  f"count {count_ms:7.2f} ms  page {page_ms:7.2f} ms  (table-wide IS NULL count {old_ms:7.2f} ms)")
+        finally:
+            db.close()
+
+    for line in query_plan(queue.order_by(*columns).limit(21)):
+        print("   plan:", line)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--teachers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    run(args.submissions, args.teachers, args.rounds)
+
+
+if __name__ == "__main__":
+    main_cli()
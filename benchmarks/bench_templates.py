@@ -0,0 +1,85 @@
+"""First-request versus steady-state page latency under each template setup.
+
+Every configuration runs in a fresh process on a seeded SQLite database:
+templates compiled lazily on first hit, precompiled at startup with an
+empty bytecode cache, and precompiled from a warm bytecode cache. For each
+one it reports the startup time and how much slower the first request to
+every page in `check_query_budgets.BUDGETS` is than its steady-state median
+(the rest of that gap is the first build of in-process data caches).
+
+    python -m benchmarks.bench_templates
+    python -m benchmarks.bench_templates --auto-reload
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import ROOT
+
+
+async def measure(rounds):
+    from benchmarks import common
+    from benchmarks.check_query_budgets import ACCOUNTS, BUDGETS
+    import main
+
+    common.reset_schema()
+    common.seed_classroom(students=20, with_history=True)
+
+    started = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        startup_ms = (time.perf_counter() - started) * 1000
+        clients = {role: await common.login(common.make_client(main.app), email) for role, email in ACCOUNTS.items()}
+        pages = []
+        try:
+            for role, url, _budget in BUDGETS:
+                samples = []
+                for _ in range(rounds + 1):
+                    began = time.perf_counter()
+                    await clients[role].get(url)
+                    samples.append((time.perf_counter() - began) * 1000)
+                pages.append({"url": url, "first_ms": samples[0], "steady_ms": statistics.median(samples[1:])})
+        finally:
+            for client in clients.values():
+                await client.aclose()
+    return {"startup_ms": startup_ms, "pages": pages}
+
+
+def run_child(label, env, rounds):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_templates", "--child", "--rounds", str(rounds)],
+                         cwd=ROOT, env=dict(os.environ, **env), capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    excess = [(page["first_ms"] - page["steady_ms"], page["url"]) for page in result["pages"]]
+    worst = max(excess)
+    print(f"{label:<32} startup {result['startup_ms']:7.1f} ms  "
+          f"first-hit excess total {sum(e for e, _ in excess):7.1f} ms  "
+          f"worst {worst[0]:6.1f} ms ({worst[1]})")
+
+
+def run(rounds, auto_reload):
+    cache_dir = tempfile.mkdtemp(prefix="igcse_jinja_")
+    base = {"TEMPLATE_AUTO_RELOAD": "1" if auto_reload else "0", "DB_WARM_CONNECTIONS": "0"}
+    run_child("lazy, no bytecode cache", dict(base, TEMPLATE_PRECOMPILE="0", TEMPLATE_BYTECODE_CACHE="0"), rounds)
+    run_child("precompiled, empty bytecode cache", dict(base, TEMPLATE_CACHE_DIR=cache_dir), rounds)
+    run_child("precompiled, warm bytecode cache", dict(base, TEMPLATE_CACHE_DIR=cache_dir), rounds)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--auto-reload", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args.rounds))))
+    else:
+        run(args.rounds, args.auto_reload)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,94 @@
+"""Admin user search: LIKE '%term%' scan versus the UserSearchToken index.
+
+Seeds `--users` accounts, then times the old LIKE filter and the n-gram
+index for a few queries (rare name, common prefix, email fragment) and
+compares their first pages. The index ignores Vietnamese diacritics and
+matches one- and two-letter words as word prefixes, so those pages can
+legitimately differ from LIKE.
+
+    python -m benchmarks.bench_user_search --users 20000 50000
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import insert, or_
+
+from benchmarks import common
+
+import models
+from database import SessionLocal
+from services import user_search
+
+FIRST_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Vũ", "Đặng", "Bùi"]
+LAST_NAMES = ["An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Khoa", "Linh", "Minh", "Ngọc", "Phúc", "Quân"]
+QUERIES = ["Khoa 1234", "tran", "user7777@", "ng"]
+
+
+def seed_users(count):
+    db = SessionLocal()
+    try:
+        db.execute(insert(models.User), [
+            {"user_id": 1000 + i, "fullname": f"{FIRST_NAMES[i % 8]} {LAST_NAMES[i % 12]} {i}",
+             "email": f"user{i}@school.vn", "password_hash": "123", "role": "student"}
+            for i in range(count)
+        ])
+        db.commit()
+        started = time.perf_counter()
+        user_search.rebuild(db)
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def like_page(db, q, limit):
+    term = f"%{q}%"
+    return [u.user_id for u in db.query(models.User).filter(
+        or_(models.User.fullname.like(term), models.User.email.like(term))
+    ).order_by(models.User.user_id).limit(limit)]
+
+
+def index_page(db, q, limit):
+    return [u.user_id for u in user_search.filter_users(db.query(models.User), q).order_by(models.User.user_id).limit(limit)]
+
+
+def timed(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def run(user_counts, rounds, limit):
+    for count in user_counts:
+        common.reset_schema()
+        rebuild = seed_users(count)
+        db = SessionLocal()
+        try:
+            for q in QUERIES:
+                index_page(db, q, limit)
+            tokens = db.query(models.UserSearchToken).count()
+            print(f"users={count} index rows={tokens} rebuild={rebuild:.1f}s")
+            for q in QUERIES:
+                like_time, like_ids = timed(lambda: like_page(db, q, limit), rounds)
+                index_time, index_ids = timed(lambda: index_page(db, q, limit), rounds)
+                same = "same rows" if like_ids == index_ids else "differs: index folds accents, short words match prefixes"
+                print(f"  q={q!r:<12} LIKE={like_time * 1000:7.1f}ms  index={index_time * 1000:7.1f}ms  "
+                      f"rows={len(index_ids)} ({same})")
+        finally:
+            db.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[20000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    run(args.users, args.rounds, args.limit)
+
+
+if __name__ == "__main__":
+    main_cli()
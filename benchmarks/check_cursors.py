@@ -0,0 +1,83 @@
+"""Fails when a paginated page answers a malformed cursor with an error.
+
+Every keyset-paginated page must treat a tampered `cursor` (bad base64,
+wrong shape, wrong length, null or non-scalar values, bad datetimes) as
+no cursor and serve the first page.
+
+    python -m benchmarks.check_cursors
+"""
+import asyncio
+import base64
+import json
+import sys
+
+from benchmarks import common
+
+import main
+from services.pagination import encode_cursor
+
+PAGES = [
+    ("student", "/student/notifications"),
+    ("teacher", "/teacher/notifications"),
+    ("teacher", "/teacher/grading"),
+    ("teacher", "/teacher/grading?tab=graded"),
+    ("admin", "/admin/financials"),
+    ("admin", "/admin/users"),
+    ("admin", "/admin/students/search?q=stud"),
+    ("parent", "/parent/alerts"),
+]
+
+ACCOUNTS = {
+    "student": "student0@bench.local",
+    "teacher": "teacher@bench.local",
+    "admin": "admin@bench.local",
+    "parent": "parent@bench.local",
+}
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+CURSORS = {
+    "garbage": "%%%not-base64",
+    "not a list": raw_cursor({"a": 1}),
+    "empty list": raw_cursor([]),
+    "too long": raw_cursor([1, 2, 3]),
+    "null values": encode_cursor([None, 1]),
+    "single null": encode_cursor([None]),
+    "empty object": raw_cursor([{}, {}]),
+    "bad datetime": raw_cursor([{"dt": "x"}, 1]),
+    "nested list": raw_cursor([[1], [2]]),
+}
+
+
+async def run(students):
+    common.reset_schema()
+    common.seed_classroom(students=students, with_history=True)
+    clients = {role: await common.login(common.make_client(main.app), email) for role, email in ACCOUNTS.items()}
+    failures = 0
+    try:
+        for role, url in PAGES:
+            separator = "&" if "?" in url else "?"
+            for name, cursor in CURSORS.items():
+                try:
+                    result = (await clients[role].get(f"{url}{separator}cursor={cursor}")).status_code
+                except Exception as exc:
+                    result = type(exc).__name__
+                ok = result == 200
+                failures += not ok
+                print(f"{'OK' if ok else 'FAILED':<8} GET {url:<36} {name:<14} {result}")
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return failures == 0
+
+
+def main_cli():
+    ok = asyncio.run(run(students=int(sys.argv[1]) if len(sys.argv) > 1 else 20))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,88 @@
+"""Fails when an endpoint issues more SQL statements than its budget.
+
+The budgets are per request with a warm user cache, on a dataset where every
+list has several rows, so an N+1 lazy load shows up as a budget overrun.
+
+    python -m benchmarks.check_query_budgets
+"""
+import asyncio
+import sys
+
+from benchmarks import common
+
+import main
+from services.query_counter import assert_max_queries
+
+
+BUDGETS = [
+    ("student", "/student/", 2),
+    ("student", "/student/courses", 0),
+    ("student", "/student/courses/search?q=bench", 0),
+    ("student", "/student/learn/1", 1),
+    ("student", "/student/lesson/1", 2),
+    ("student", "/student/quiz/take/1", 2),
+    ("student", "/student/quiz/result/1", 2),
+    ("student", "/student/assignment/1", 2),
+    ("student", "/student/notifications", 2),
+    ("teacher", "/teacher/", 5),
+    ("teacher", "/teacher/course/1", 4),
+    ("teacher", "/teacher/lesson/1", 2),
+    ("teacher", "/teacher/quiz/1", 2),
+    ("teacher", "/teacher/grading", 2),
+    ("teacher", "/teacher/grading?tab=graded", 2),
+    ("teacher", "/teacher/notifications", 2),
+    ("admin", "/admin/financials", 2),
+    ("admin", "/admin/users", 3),
+    ("admin", "/admin/users?search=student", 3),
+    ("admin", "/admin/students/search?q=stud", 1),
+    ("manager", "/manager/dashboard", 1),
+    ("manager", "/manager/courses", 0),
+    ("manager", "/manager/courses/1", 4),
+    ("manager", "/manager/reports", 0),
+    ("parent", "/parent/", 3),
+    ("parent", "/parent/child/100", 5),
+    ("parent", "/parent/overview", 5),
+    ("parent", "/parent/alerts", 2),
+]
+
+ACCOUNTS = {
+    "student": "student0@bench.local",
+    "teacher": "teacher@bench.local",
+    "admin": "admin@bench.local",
+    "manager": "manager@bench.local",
+    "parent": "parent@bench.local",
+}
+
+
+async def run(students):
+    common.reset_schema()
+    common.seed_classroom(students=students, with_history=True)
+
+    clients = {role: await common.login(common.make_client(main.app), email) for role, email in ACCOUNTS.items()}
+    failures = 0
+    try:
+        for role, url, budget in BUDGETS:
+            client = clients[role]
+            await client.get(url)
+            try:
+                with assert_max_queries(budget, label=f"GET {url}") as counter:
+                    resp = await client.get(url)
+                status = "OK"
+            except AssertionError as exc:
+                failures += 1
+                status = "OVER BUDGET"
+                print(exc)
+            print(f"{status:<12} GET {url:<36} {resp.status_code}  {counter.count}/{budget} statements")
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return failures == 0
+
+
+def main_cli():
+    ok = asyncio.run(run(students=int(sys.argv[1]) if len(sys.argv) > 1 else 20))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
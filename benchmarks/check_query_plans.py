@@ -0,0 +1,106 @@
+"""Fails when a hot route runs a query that scans a large table.
+
+Replays every GET in `check_query_budgets.BUDGETS` against a seeded SQLite
+database, records each statement with its parameters and runs EXPLAIN
+QUERY PLAN on it. A `SCAN <table>` step (a full table or full index scan)
+on a table outside `SCAN_ALLOWED` is reported with the offending SQL,
+unless it walks an index or the rowid in ORDER BY order under a LIMIT
+(a keyset page stops after one page of rows).
+
+    python -m benchmarks.check_query_plans
+"""
+import asyncio
+import re
+import sys
+
+from sqlalchemy import event
+
+from benchmarks import common
+from benchmarks.check_query_budgets import ACCOUNTS, BUDGETS
+
+import main
+from database import engine
+
+# small tables read in full on purpose: the teacher picker, the revenue
+# rollup (one row per day and course) and the course list behind the
+# cached catalog and manager snapshots
+SCAN_ALLOWED = {"Course", "Teachers", "RevenueDaily"}
+
+SCAN = re.compile(r"^SCAN (\w+)")
+LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+class PlanRecorder:
+    def __init__(self):
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(engine, "before_cursor_execute", self._record)
+        return False
+
+
+def scans(statement, parameters):
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plan = [row[-1] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+    bounded = LIMIT.search(statement) and not any(step.startswith("USE TEMP B-TREE FOR ORDER BY") for step in plan)
+    tables = []
+    for step in plan:
+        match = SCAN.match(step)
+        if not match or bounded or match.group(1) in SCAN_ALLOWED or match.group(1).startswith("anon_"):
+            continue
+        tables.append(step)
+    return tables
+
+
+async def run(students):
+    if engine.dialect.name != "sqlite":
+        print("check_query_plans chỉ chạy trên SQLite (EXPLAIN QUERY PLAN).")
+        return False
+
+    common.reset_schema()
+    common.seed_classroom(students=students, with_history=True)
+
+    clients = {role: await common.login(common.make_client(main.app), email) for role, email in ACCOUNTS.items()}
+    failures = 0
+    try:
+        for role, url, _budget in BUDGETS:
+            client = clients[role]
+            await client.get(url)
+            with PlanRecorder() as recorder:
+                resp = await client.get(url)
+            problems = []
+            for statement, parameters in recorder.statements:
+                for step in scans(statement, parameters):
+                    problems.append(f"    {step}\n      {' '.join(statement.split())[:240]}")
+            status = "OK" if not problems else "SCAN"
+            failures += bool(problems)
+            print(f"{status:<6} GET {url:<36} {resp.status_code}  {len(recorder.statements)} statements")
+            for problem in problems:
+                print(problem)
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return failures == 0
+
+
+def main_cli():
+    ok = asyncio.run(run(students=int(sys.argv[1]) if len(sys.argv) > 1 else 20))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,72 @@
+"""Fails when the user search index misses rows the old LIKE search found.
+
+Seeds accounts whose emails contain `_` and `.`, then runs each query
+through `user_search.filter_users` and through the baseline
+`LIKE '%term%'` on fullname and email. Every row LIKE finds must also
+be found by the index.
+
+    python -m benchmarks.check_user_search
+"""
+import sys
+
+from sqlalchemy import insert, or_
+
+from benchmarks import common
+
+import models
+from database import SessionLocal
+from services import user_search
+
+USERS = [
+    ("John Doe", "john_doe@example.com"),
+    ("Mary Jane Smith", "mary.jane_smith@school.edu.vn"),
+    ("Trần Văn An", "tran.van_an@school.edu.vn"),
+    ("Lê Bình", "le_binh_99@mail.example.com"),
+    ("Jo_Anne Nguyen", "joanne@example.com"),
+    ("Other Person", "other@example.com"),
+]
+
+QUERIES = [
+    "john_doe", "john_doe@example.com", "mary.jane", "jane_smith", "mary.jane_smith@school.edu.vn",
+    "school.edu", "tran.van_an", "le_binh_99", "binh_99@mail", "Jo_Anne", "example.com",
+]
+
+
+def like_ids(db, q):
+    term = f"%{q}%"
+    return {u.user_id for u in db.query(models.User).filter(
+        or_(models.User.fullname.like(term), models.User.email.like(term))
+    )}
+
+
+def index_ids(db, q):
+    return {u.user_id for u in user_search.filter_users(db.query(models.User), q)}
+
+
+def run():
+    common.reset_schema()
+    db = SessionLocal()
+    failures = 0
+    try:
+        db.execute(insert(models.User), [
+            {"user_id": 1000 + i, "fullname": fullname, "email": email, "password_hash": common.PASSWORD, "role": "student"}
+            for i, (fullname, email) in enumerate(USERS)
+        ])
+        db.commit()
+        user_search.rebuild(db)
+        for q in QUERIES:
+            expected, found = like_ids(db, q), index_ids(db, q)
+            ok = bool(expected) and expected <= found
+            failures += not ok
+            print(f"{'OK' if ok else 'MISSING':<8} q={q!r:<34} LIKE={sorted(expected)}  index={sorted(found)}")
+    finally:
+        db.close()
+    return failures == 0
+
+
+def main_cli():
+    sys.exit(0 if run() else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if "DATABASE_URL" not in os.environ:
+    _db_path = os.path.join(tempfile.mkdtemp(prefix="igcse_bench_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import datetime
+
+import httpx
+from sqlalchemy import event
+
+import models
+from database import engine, SessionLocal
+from services import user_search
+
+PASSWORD = "123"
+
+
+def reset_schema():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+
+def seed_classroom(students=30, questions=10, with_history=False):
+    db = SessionLocal()
+    try:
+        db.add_all([
+            models.User(user_id=1, fullname="Admin", email="admin@bench.local", password_hash=PASSWORD, role="admin"),
+            models.User(user_id=2, fullname="Teacher", email="teacher@bench.local", password_hash=PASSWORD, role="teacher"),
+            models.User(user_id=3, fullname="Manager", email="manager@bench.local", password_hash=PASSWORD, role="manager"),
+            models.User(user_id=4, fullname="Parent", email="parent@bench.local", password_hash=PASSWORD, role="parent"),
+        ])
+        db.flush()
+        db.add(models.Teacher(teacher_id=2, teacher_code="GV0002", specialization="Math"))
+        parent = models.Parent(parent_id=4, phone_number="")
+        db.add(parent)
+        db.add(models.Course(course_id=1, title="Bench Course", description="", price=100, teacher_id=2, status="active"))
+        db.add(models.Lesson(lesson_id=1, title="Bench Lesson", content="<p>Bench lesson</p>", content_size=19, course_id=1))
+        db.add(models.Quiz(quiz_id=1, title="Bench Quiz", duration=15, course_id=1))
+        db.add(models.Assignment(assignment_id=1, title="Bench Assignment", max_score=10, content="Explain", course_id=1))
+        db.flush()
+        quiz_questions = [
+            models.Question(
+                quiz_id=1, content=f"Q{i}", question_type="single_choice",
+                option_a="A", option_b="B", option_c="C", option_d="D", correct_answer="ABCD"[i % 4]
+            )
+            for i in range(questions)
+        ]
+        db.add_all(quiz_questions)
+        db.flush()
+        now = datetime.datetime.utcnow()
+
+        emails = []
+        for i in range(students):
+            user_id = 100 + i
+            email = f"student{i}@bench.local"
+            db.add(models.User(user_id=user_id, fullname=f"Student {i}", email=email, password_hash=PASSWORD, role="student"))
+            db.flush()
+            student = models.Student(student_id=user_id, student_code=f"HS{user_id:04d}", grade_level="10")
+            db.add(student)
+            db.add(models.Payment(student_id=user_id, course_id=1, amount=100, status="paid", payment_date=now))
+            if with_history:
+                if i < 3:
+                    parent.children.append(student)
+                db.add(models.Submission(assignment_id=1, student_id=user_id, answer=f"Answer {i}", submitted_at=now))
+                db.add(models.QuizSubmission(
+                    quiz_id=1, student_id=user_id, score=5, submitted_at=now,
+                    answers=[models.QuizAnswer(question_id=q.question_id, selected_option="A", is_correct=q.correct_answer == "A") for q in quiz_questions]
+                ))
+                db.add(models.Notification(user_id=user_id, message=f"Welcome {i}", is_read=False))
+            emails.append(email)
+        db.commit()
+        user_search.rebuild(db)
+        return emails
+    finally:
+        db.close()
+
+
+def add_statement_latency(seconds):
+    def _sleep(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(seconds)
+    event.listen(engine, "before_cursor_execute", _sleep)
+    return lambda: event.remove(engine, "before_cursor_execute", _sleep)
+
+
+def make_client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def login(client, email):
+    resp = await client.post("/login", data={"email": email, "password": PASSWORD})
+    assert resp.status_code == 302, resp.text
+    return client
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,269 @@
+"""Synthetic dataset covering the whole schema, at configurable scale.
+
+Fills every table in `models.py` with deterministic (seeded) data:
+teachers teaching courses with lessons, quizzes, questions and
+assignments; students enrolled through paid payments, attempting quizzes
+(with one QuizAnswer per question), submitting essays in every grading
+state and viewing lessons; parents with children; course announcements
+fanned out as notifications; queued grading jobs and cached AI grades.
+The derived tables (RevenueDaily, unread counters, UserSearchToken,
+StudentProgress) are rebuilt from that data at the end.
+
+Well-known accounts (password "123"): admin@load.local,
+manager@load.local, teacher0@load.local, student0@load.local and
+parent0@load.local (children student0-2). teacher0 teaches course 1,
+which student0 owns.
+
+    DATABASE_URL=sqlite:///load.db python -m benchmarks.datagen --scale large
+"""
+import argparse
+import datetime
+import random
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert, select
+
+from benchmarks import common
+
+import models
+from database import SessionLocal
+from services import grading_cache, grading_status, lesson_content, progress, revenue, user_search
+from services.notifications import rebuild_unread_counters
+
+SCALES = {
+    "tiny": dict(students=200, teachers=5, courses=12, enrollments=3, lessons=6, quizzes=2, questions=8,
+                 assignments=2, attempt_rate=0.6, submission_rate=0.5, view_rate=0.5, notifications=2, lesson_kb=2),
+    "small": dict(students=2000, teachers=20, courses=60, enrollments=4, lessons=10, quizzes=3, questions=10,
+                  assignments=2, attempt_rate=0.5, submission_rate=0.5, view_rate=0.4, notifications=3, lesson_kb=4),
+    "medium": dict(students=10000, teachers=80, courses=200, enrollments=4, lessons=12, quizzes=4, questions=10,
+                   assignments=2, attempt_rate=0.5, submission_rate=0.5, view_rate=0.3, notifications=4, lesson_kb=6),
+    "large": dict(students=50000, teachers=200, courses=500, enrollments=4, lessons=12, quizzes=4, questions=10,
+                  assignments=2, attempt_rate=0.5, submission_rate=0.5, view_rate=0.3, notifications=4, lesson_kb=8),
+}
+
+PASSWORD = common.PASSWORD
+SUBJECTS = ["Toán", "Vật lý", "Hóa học", "Sinh học", "Tiếng Anh", "Tin học", "Kinh tế", "Địa lý"]
+OPTIONS = "ABCD"
+ADMIN_ID, MANAGER_ID = 1, 2
+TEACHER_BASE, PARENT_BASE, STUDENT_BASE = 1000, 100000, 200000
+BATCH = 20000
+
+
+TABLE_ORDER = {table.name: i for i, table in enumerate(models.Base.metadata.sorted_tables)}
+
+
+def _table(target):
+    return getattr(target, "__table__", target)
+
+
+class Writer:
+    def __init__(self, db):
+        self.db = db
+        self.rows = {}
+
+    def add(self, target, row):
+        pending = self.rows.setdefault(_table(target), [])
+        pending.append(row)
+        if len(pending) >= BATCH:
+            self.flush()
+
+    def flush(self):
+        for table in sorted(self.rows, key=lambda table: TABLE_ORDER[table.name]):
+            pending = self.rows[table]
+            if pending:
+                self.db.execute(insert(table), pending)
+                self.rows[table] = []
+
+
+def _lesson_html(rng, kb):
+    paragraph = "<p>" + " ".join(rng.choice(SUBJECTS) + " IGCSE ghi chú bài giảng." for _ in range(12)) + "</p>\n"
+    return paragraph * max(1, kb * 1024 // len(paragraph.encode("utf-8")))
+
+
+def generate(scale="small", seed=42, log=print, **overrides):
+    params = dict(SCALES[scale], **overrides)
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+
+    def moment(days=365):
+        return now - datetime.timedelta(seconds=rng.randrange(days * 86400))
+
+    students, teachers, courses = params["students"], params["teachers"], params["courses"]
+    started = time.perf_counter()
+    db = SessionLocal()
+    out = Writer(db)
+    try:
+        out.add(models.User, dict(user_id=ADMIN_ID, fullname="Quản trị viên", email="admin@load.local",
+                                  password_hash=PASSWORD, role="admin", created_at=now))
+        out.add(models.User, dict(user_id=MANAGER_ID, fullname="Quản lý đào tạo", email="manager@load.local",
+                                  password_hash=PASSWORD, role="manager", created_at=now))
+        for t in range(teachers):
+            user_id = TEACHER_BASE + t
+            out.add(models.User, dict(user_id=user_id, fullname=f"Giáo viên {t}", email=f"teacher{t}@load.local",
+                                      password_hash=PASSWORD, role="teacher", created_at=moment(720)))
+            out.add(models.Teacher, dict(teacher_id=user_id, teacher_code=f"GV{user_id}", specialization=SUBJECTS[t % len(SUBJECTS)]))
+
+        lessons, quizzes, assignments = {}, {}, {}
+        questions = {}
+        lesson_id = quiz_id = question_id = assignment_id = 0
+        for c in range(courses):
+            course_id = c + 1
+            out.add(models.Course, dict(course_id=course_id, title=f"IGCSE {SUBJECTS[c % len(SUBJECTS)]} {c}",
+                                        description="Khóa học luyện thi IGCSE", price=float(50 + (c * 37) % 250),
+                                        status="active" if c % 10 else "draft", teacher_id=TEACHER_BASE + c % teachers,
+                                        updated_at=now))
+            lessons[course_id] = []
+            for i in range(params["lessons"]):
+                lesson_id += 1
+                lesson = SimpleNamespace()
+                lesson_content.set_content(lesson, _lesson_html(rng, params["lesson_kb"]))
+                out.add(models.Lesson, dict(lesson_id=lesson_id, title=f"Bài {i + 1}", course_id=course_id, **vars(lesson)))
+                lessons[course_id].append(lesson_id)
+            quizzes[course_id] = []
+            for i in range(params["quizzes"]):
+                quiz_id += 1
+                out.add(models.Quiz, dict(quiz_id=quiz_id, title=f"Kiểm tra {i + 1}", duration=15 + 5 * i, course_id=course_id))
+                quizzes[course_id].append(quiz_id)
+                questions[quiz_id] = []
+                for q in range(params["questions"]):
+                    question_id += 1
+                    correct = OPTIONS[rng.randrange(4)]
+                    out.add(models.Question, dict(question_id=question_id, quiz_id=quiz_id, content=f"Câu {q + 1}",
+                                                  question_type="single_choice", option_a="A", option_b="B",
+                                                  option_c="C", option_d="D", correct_answer=correct))
+                    questions[quiz_id].append((question_id, correct))
+            assignments[course_id] = []
+            for i in range(params["assignments"]):
+                assignment_id += 1
+                out.add(models.Assignment, dict(assignment_id=assignment_id, title=f"Tự luận {i + 1}", max_score=10,
+                                                content="Trình bày lời giải chi tiết.", course_id=course_id))
+                assignments[course_id].append(assignment_id)
+        out.flush()
+
+        parents = max(1, students // 3)
+        for p in range(parents):
+            user_id = PARENT_BASE + p
+            out.add(models.User, dict(user_id=user_id, fullname=f"Phụ huynh {p}", email=f"parent{p}@load.local",
+                                      password_hash=PASSWORD, role="parent", created_at=moment(720)))
+            out.add(models.Parent, dict(parent_id=user_id, phone_number=f"09{user_id:08d}"))
+
+        enrolled = {}
+        step = max(1, courses // params["enrollments"])
+        submission_id = quiz_submission_id = answer_id = announcement_id = job_id = 0
+        cached_answers = set()
+        for s in range(students):
+            user_id = STUDENT_BASE + s
+            out.add(models.User, dict(user_id=user_id, fullname=f"Học sinh {s}", email=f"student{s}@load.local",
+                                      password_hash=PASSWORD, role="student", created_at=moment(720)))
+            out.add(models.Student, dict(student_id=user_id, student_code=f"HS{user_id}", grade_level=f"Lớp {9 + s % 3}"))
+            out.add(models.parent_student_association, dict(parent_id=PARENT_BASE + min(s // 3, parents - 1), student_id=user_id))
+
+            for k in range(params["enrollments"]):
+                course_id = (s + k * step) % courses + 1
+                enrolled.setdefault(course_id, []).append(user_id)
+                paid_at = moment()
+                out.add(models.Payment, dict(student_id=user_id, course_id=course_id, amount=float(50 + ((course_id - 1) * 37) % 250),
+                                             status="paid", payment_date=paid_at))
+                for lesson in lessons[course_id]:
+                    if s == 0 or rng.random() < params["view_rate"]:
+                        out.add(models.LessonView, dict(student_id=user_id, lesson_id=lesson, viewed_at=moment()))
+                for quiz in quizzes[course_id]:
+                    if s != 0 and rng.random() >= params["attempt_rate"]:
+                        continue
+                    quiz_submission_id += 1
+                    skill = rng.random()
+                    answers = []
+                    for question, correct in questions[quiz]:
+                        answer_id += 1
+                        selected = correct if rng.random() < skill else OPTIONS[rng.randrange(4)]
+                        answers.append(dict(answer_id=answer_id, submission_id=quiz_submission_id, question_id=question,
+                                            selected_option=selected, is_correct=selected == correct))
+                    correct_count = sum(answer["is_correct"] for answer in answers)
+                    score = round(correct_count / len(answers) * 10, 2) if answers else 0
+                    out.add(models.QuizSubmission, dict(submission_id=quiz_submission_id, quiz_id=quiz, student_id=user_id,
+                                                         score=score, submitted_at=moment()))
+                    for answer in answers:
+                        out.add(models.QuizAnswer, answer)
+                for assignment in assignments[course_id]:
+                    if s != 0 and rng.random() >= params["submission_rate"]:
+                        continue
+                    submission_id += 1
+                    answer = f"Bài làm {rng.randrange(50)}"
+                    state = rng.random()
+                    row = dict(submission_id=submission_id, assignment_id=assignment, student_id=user_id, answer=answer,
+                               submitted_at=moment(), ai_score=None, teacher_score=None, teacher_feedback=None, graded_by=None,
+                               grading_status=grading_status.PENDING)
+                    if state >= 0.15:
+                        score = float(rng.randrange(3, 11))
+                        by_teacher = state >= 0.7
+                        row.update(ai_score=score, teacher_score=score,
+                                   teacher_feedback="Giáo viên đã chấm" if by_teacher else "Chấm tự động",
+                                   graded_by="Teacher" if by_teacher else "AI",
+                                   grading_status=grading_status.GRADED if by_teacher else grading_status.AI_GRADED)
+                    out.add(models.Submission, row)
+
+                    if state < 0.15:
+                        job_id += 1
+                        out.add(models.GradingJob, dict(job_id=job_id, submission_id=submission_id, status="queued",
+                                                        attempts=0, max_attempts=5, next_run_at=now, created_at=now, updated_at=now))
+                    elif row["graded_by"] == "AI" and (assignment, answer) not in cached_answers:
+                        cached_answers.add((assignment, answer))
+                        out.add(models.GradingCache, dict(assignment_id=assignment, answer_hash=grading_cache.answer_hash(answer),
+                                                          score=row["ai_score"], feedback="Chấm tự động", grade_seconds=1.5,
+                                                          hit_count=0, created_at=now, last_used_at=now))
+
+            for n in range(params["notifications"]):
+                out.add(models.Notification, dict(user_id=user_id, message=f"Nhắc nhở học tập {n + 1}",
+                                                  created_at=moment(90), is_read=rng.random() < 0.6))
+        for p in range(min(parents, 1000)):
+            out.add(models.Notification, dict(user_id=PARENT_BASE + p, message="Báo cáo học tập hàng tháng",
+                                              created_at=moment(90), is_read=False))
+        out.flush()
+
+        for course_id in range(1, courses + 1):
+            recipients = enrolled.get(course_id, [])
+            announcement_id += 1
+            sent_at = moment(60)
+            out.add(models.Announcement, dict(announcement_id=announcement_id, course_id=course_id,
+                                              teacher_id=TEACHER_BASE + (course_id - 1) % teachers,
+                                              message="Lịch kiểm tra giữa kỳ đã được cập nhật.", status="delivered",
+                                              recipient_count=len(recipients), created_at=sent_at, delivered_at=sent_at))
+            for user_id in recipients:
+                out.add(models.Notification, dict(user_id=user_id, message="Lịch kiểm tra giữa kỳ đã được cập nhật.",
+                                                  created_at=sent_at, is_read=rng.random() < 0.5, announcement_id=announcement_id))
+        out.flush()
+        db.commit()
+        log(f"  base tables  {time.perf_counter() - started:7.1f} s")
+
+        for label, rebuild in (("revenue", revenue.rebuild), ("unread", rebuild_unread_counters),
+                               ("user search", user_search.rebuild), ("progress", progress.rebuild)):
+            began = time.perf_counter()
+            rebuild(db)
+            db.commit()
+            log(f"  {label:<12} {time.perf_counter() - began:7.1f} s")
+        return {table.name: db.execute(select(func.count()).select_from(table)).scalar()
+                for table in models.Base.metadata.sorted_tables}
+    finally:
+        db.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--students", type=int, default=None)
+    parser.add_argument("--courses", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    overrides = {key: value for key, value in (("students", args.students), ("courses", args.courses)) if value}
+
+    common.reset_schema()
+    started = time.perf_counter()
+    counts = generate(args.scale, seed=args.seed, **overrides)
+    for table, count in counts.items():
+        print(f"  {table:<18} {count:>10,}")
+    print(f"Generated '{args.scale}' dataset in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,58 @@
+"""OpenAI-compatible fake chat endpoint for grader benchmarks.
+
+Answers POST /v1/chat/completions after a fixed latency (plus a small
+per-answer cost for batched prompts) and records how many requests were
+in flight at once. Benchmarks mount it in-process through
+`httpx.ASGITransport`; it can also be served on its own:
+
+    FAKE_AI_LATENCY=0.3 uvicorn benchmarks.fake_ai:app --port 9000
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 AI_GRADER=openai python manage.py grading-worker
+"""
+import asyncio
+import json
+import os
+import re
+
+from fastapi import FastAPI
+
+app = FastAPI()
+
+BATCH_ITEM = re.compile(r"--- BÀI #(\d+) ---")
+
+
+class Meter:
+    def __init__(self):
+        self.latency = float(os.getenv("FAKE_AI_LATENCY", "0.2"))
+        self.per_item = float(os.getenv("FAKE_AI_PER_ITEM", "0.01"))
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.answers = 0
+        self.in_flight = 0
+        self.peak = 0
+
+
+meter = Meter()
+
+
+def _grade(index):
+    return {"score": 5 + index % 5, "feedback": f"Bài #{index}: ổn."}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(payload: dict):
+    prompt = payload["messages"][-1]["content"]
+    items = [int(i) for i in BATCH_ITEM.findall(prompt)]
+
+    meter.requests += 1
+    meter.answers += len(items) or 1
+    meter.in_flight += 1
+    meter.peak = max(meter.peak, meter.in_flight)
+    try:
+        await asyncio.sleep(meter.latency + meter.per_item * len(items))
+    finally:
+        meter.in_flight -= 1
+
+    content = [dict(id=i, **_grade(i)) for i in items] if items else _grade(len(prompt))
+    return {"choices": [{"message": {"role": "assistant", "content": json.dumps(content, ensure_ascii=False)}}]}
@@ -0,0 +1,93 @@
+import os
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+DB_BACKEND = os.getenv("DB_BACKEND", "mssql")
+
+MSSQL_SERVER = os.getenv("MSSQL_SERVER", r"quocthanh")
+MSSQL_DATABASE = os.getenv("MSSQL_DATABASE", "IGCSE_LearningHub")
+MSSQL_USERNAME = os.getenv("MSSQL_USERNAME", "sa")
+MSSQL_PASSWORD = os.getenv("MSSQL_PASSWORD", "123")
+MSSQL_DRIVER = os.getenv("MSSQL_DRIVER", "ODBC Driver 17 for SQL Server")
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "igcse_local.db")
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 20)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 30)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_FAST_EXECUTEMANY = _env_bool("DB_FAST_EXECUTEMANY", True)
+DB_CREATE_SCHEMA = _env_bool("DB_CREATE_SCHEMA", False)
+DB_WARM_CONNECTIONS = _env_int("DB_WARM_CONNECTIONS", 4)
+
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "templates")
+TEMPLATE_AUTO_RELOAD = _env_bool("TEMPLATE_AUTO_RELOAD", True)
+TEMPLATE_BYTECODE_CACHE = _env_bool("TEMPLATE_BYTECODE_CACHE", True)
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", "")
+TEMPLATE_PRECOMPILE = _env_bool("TEMPLATE_PRECOMPILE", True)
+
+SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
+SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", "session")
+SESSION_MAX_AGE = _env_int("SESSION_MAX_AGE", 7 * 24 * 3600)
+USER_CACHE_TTL = _env_int("USER_CACHE_TTL", 60)
+USER_CACHE_SIZE = _env_int("USER_CACHE_SIZE", 10000)
+
+PAGE_SIZE = _env_int("PAGE_SIZE", 20)
+MAX_PAGE_SIZE = _env_int("MAX_PAGE_SIZE", 100)
+
+ANSWER_KEY_TTL = _env_int("ANSWER_KEY_TTL", 600)
+ANSWER_KEY_CACHE_SIZE = _env_int("ANSWER_KEY_CACHE_SIZE", 2000)
+
+QUIZ_COURSE_TTL = _env_int("QUIZ_COURSE_TTL", 3600)
+QUIZ_COURSE_CACHE_SIZE = _env_int("QUIZ_COURSE_CACHE_SIZE", 5000)
+
+AI_GRADER = os.getenv("AI_GRADER", "openai")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "30"))
+AI_CONCURRENCY = _env_int("AI_CONCURRENCY", 8)
+AI_RATE_PER_SECOND = float(os.getenv("AI_RATE_PER_SECOND", "0"))
+AI_RATE_BURST = _env_int("AI_RATE_BURST", 10)
+AI_BATCH_SIZE = _env_int("AI_BATCH_SIZE", 1)
+AI_BATCH_WAIT_MS = _env_int("AI_BATCH_WAIT_MS", 50)
+AI_GRADER_STUB_DELAY = float(os.getenv("AI_GRADER_STUB_DELAY", "0"))
+GRADING_CONCURRENCY = _env_int("GRADING_CONCURRENCY", 4)
+GRADING_MAX_ATTEMPTS = _env_int("GRADING_MAX_ATTEMPTS", 5)
+GRADING_RETRY_BASE_SECONDS = _env_int("GRADING_RETRY_BASE_SECONDS", 10)
+GRADING_RETRY_MAX_SECONDS = _env_int("GRADING_RETRY_MAX_SECONDS", 600)
+GRADING_POLL_SECONDS = float(os.getenv("GRADING_POLL_SECONDS", "1"))
+GRADING_STALE_SECONDS = _env_int("GRADING_STALE_SECONDS", 300)
+
+GRADING_CACHE_ENABLED = _env_bool("GRADING_CACHE_ENABLED", True)
+GRADING_CACHE_SIZE = _env_int("GRADING_CACHE_SIZE", 50000)
+GRADING_CACHE_EVICT_EVERY = _env_int("GRADING_CACHE_EVICT_EVERY", 100)
+
+CATALOG_TTL = _env_int("CATALOG_TTL", 300)
+OWNED_COURSES_TTL = _env_int("OWNED_COURSES_TTL", 300)
+OWNED_COURSES_CACHE_SIZE = _env_int("OWNED_COURSES_CACHE_SIZE", 10000)
+COURSE_STATS_TTL = _env_int("COURSE_STATS_TTL", 60)
+COURSE_CONTENT_TTL = _env_int("COURSE_CONTENT_TTL", 3600)
+COURSE_CONTENT_CACHE_SIZE = _env_int("COURSE_CONTENT_CACHE_SIZE", 200)
+LESSON_GZIP = _env_bool("LESSON_GZIP", False)
+LESSON_GZIP_MIN_BYTES = _env_int("LESSON_GZIP_MIN_BYTES", 4096)
+
+USER_SEARCH_STATS_TTL = _env_int("USER_SEARCH_STATS_TTL", 600)
+
+ANALYTICS_TTL = _env_int("ANALYTICS_TTL", 600)
+ANALYTICS_PASS_MARK = float(os.getenv("ANALYTICS_PASS_MARK", "5"))
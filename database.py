@@ -1,29 +1,83 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 import urllib.parse
 
-SERVER = r'quocthanh'  
-DATABASE = 'IGCSE_LearningHub'
-USERNAME = 'sa'
-PASSWORD = '123'
+import config
 
-connection_string = (
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={SERVER};"
-    f"DATABASE={DATABASE};"
-    f"UID={USERNAME};"
-    f"PWD={PASSWORD};"
-    f"TrustServerCertificate=yes;"
-)
 
-params = urllib.parse.quote_plus(connection_string)
+def build_database_url():
+    if config.DATABASE_URL:
+        return config.DATABASE_URL
 
-SQLALCHEMY_DATABASE_URL = f"mssql+pyodbc:///?odbc_connect={params}&charset=utf8"
+    if config.DB_BACKEND == "sqlite":
+        return f"sqlite:///{config.SQLITE_PATH}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    echo=False
-)
+    connection_string = (
+        f"DRIVER={{{config.MSSQL_DRIVER}}};"
+        f"SERVER={config.MSSQL_SERVER};"
+        f"DATABASE={config.MSSQL_DATABASE};"
+        f"UID={config.MSSQL_USERNAME};"
+        f"PWD={config.MSSQL_PASSWORD};"
+        f"TrustServerCertificate=yes;"
+    )
+    params = urllib.parse.quote_plus(connection_string)
+    return f"mssql+pyodbc:///?odbc_connect={params}&charset=utf8"
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _engine_options(url):
+    options = {"echo": config.DB_ECHO}
+
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            options["poolclass"] = StaticPool
+            return options
+
+    options.update(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+    )
+    if url.drivername == "mssql+pyodbc":
+        options["fast_executemany"] = config.DB_FAST_EXECUTEMANY
+    return options
+
+
+def create_db_engine(url=None):
+    url = make_url(url or build_database_url())
+    db_engine = create_engine(url, **_engine_options(url))
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(db_engine, "connect", _sqlite_pragmas)
+    return db_engine
+
+
+def warm_pool(db_engine, count):
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(db_engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+SQLALCHEMY_DATABASE_URL = build_database_url()
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,17 +1,70 @@
 from fastapi import Request, Depends
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from sqlalchemy.orm import Session, joinedload
+from database import get_db
+from services.cache import TTLCache
+from services.session_token import read_session_token
+import config
 import models
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+user_cache = TTLCache(config.USER_CACHE_TTL, config.USER_CACHE_SIZE)
+
+PROFILE_ATTRS = {"student": "student_profile", "teacher": "teacher_profile", "parent": "parent_profile"}
+
+class CurrentUser:
+    __slots__ = ("user_id", "fullname", "email", "role", "created_at", "profile_id")
+
+    def __init__(self, user_id, fullname, email, role, created_at=None, profile_id=None):
+        self.user_id = user_id
+        self.fullname = fullname
+        self.email = email
+        self.role = role
+        self.created_at = created_at
+        self.profile_id = profile_id
+
+    @classmethod
+    def from_model(cls, user: models.User):
+        attr = PROFILE_ATTRS.get(user.role)
+        profile = getattr(user, attr) if attr else None
+        return cls(user.user_id, user.fullname, user.email, user.role, user.created_at, user.user_id if profile else None)
+
+    @property
+    def student_id(self):
+        return self.profile_id if self.role == "student" else None
+
+    @property
+    def teacher_id(self):
+        return self.profile_id if self.role == "teacher" else None
+
+    @property
+    def parent_id(self):
+        return self.profile_id if self.role == "parent" else None
+
+def load_current_user(db: Session, user_id: int):
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = db.query(models.User).options(
+        joinedload(models.User.student_profile),
+        joinedload(models.User.teacher_profile),
+        joinedload(models.User.parent_profile)
+    ).filter(models.User.user_id == user_id).first()
+    if not user:
+        return None
+
+    current = CurrentUser.from_model(user)
+    user_cache.set(user_id, current)
+    return current
+
+def invalidate_user(user_id: int):
+    user_cache.invalidate(user_id)
 
 def get_current_user(request: Request, db: Session = Depends(get_db)):
-    user_id = request.cookies.get("user_id")
-    if not user_id:
+    claims = read_session_token(request.cookies.get(config.SESSION_COOKIE_NAME))
+    if not claims:
+        return None
+
+    user = load_current_user(db, claims["uid"])
+    if not user or user.role != claims.get("role"):
         return None
-    return db.query(models.User).filter(models.User.user_id == int(user_id)).first()
\ No newline at end of file
+    return user
\ No newline at end of file
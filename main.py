@@ -1,21 +1,45 @@
-from fastapi import FastAPI, Request, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
-from database import engine
-import models
+from database import engine, warm_pool
 from routers import auth, admin, manager, teacher, student, parent, profile
+import config
+import models
+import templating
+
+
+def startup():
+    if config.DB_CREATE_SCHEMA:
+        models.Base.metadata.create_all(bind=engine)
+    warm_pool(engine, min(config.DB_WARM_CONNECTIONS, config.DB_POOL_SIZE))
+    if config.TEMPLATE_PRECOMPILE:
+        templating.precompile()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await run_in_threadpool(startup)
+    yield
+
+
+def create_app():
+    app = FastAPI(lifespan=lifespan)
+
+    app.include_router(auth.router)
+    app.include_router(admin.router)
+    app.include_router(manager.router)
+    app.include_router(teacher.router)
+    app.include_router(student.router)
+    app.include_router(parent.router)
+    app.include_router(profile.router)
 
-models.Base.metadata.create_all(bind=engine)
+    @app.get("/")
+    async def root():
+        return RedirectResponse("/login")
 
-app = FastAPI()
+    return app
 
-app.include_router(auth.router)
-app.include_router(admin.router)
-app.include_router(manager.router)
-app.include_router(teacher.router)
-app.include_router(student.router)
-app.include_router(parent.router)
-app.include_router(profile.router)
 
-@app.get("/")
-async def root():
-    return RedirectResponse("/login")
\ No newline at end of file
+app = create_app()
\ No newline at end of file
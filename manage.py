@@ -0,0 +1,164 @@
+import argparse
+
+from database import SessionLocal
+from services.ai_grader import get_grader, close_client
+from services import grading_cache
+import models
+
+
+def rebuild_revenue(args):
+    from services import revenue
+
+    db = SessionLocal()
+    try:
+        rows = revenue.rebuild(db)
+        print(f"Đã tính lại sổ doanh thu: {rows} dòng.")
+    finally:
+        db.close()
+
+
+def rebuild_unread(args):
+    from services.notifications import rebuild_unread_counters
+
+    db = SessionLocal()
+    try:
+        rebuild_unread_counters(db)
+        print("Đã đếm lại số thông báo chưa đọc cho mọi người dùng.")
+    finally:
+        db.close()
+
+
+def rebuild_progress(args):
+    from services import progress
+
+    db = SessionLocal()
+    try:
+        rows = progress.rebuild(db)
+        print(f"Đã tính lại tiến độ học tập: {rows} dòng (học sinh × khóa học).")
+    finally:
+        db.close()
+
+
+def rebuild_user_index(args):
+    from services import user_search
+
+    db = SessionLocal()
+    try:
+        count = user_search.rebuild(db)
+        print(f"Đã lập lại chỉ mục tìm kiếm cho {count} người dùng.")
+    finally:
+        db.close()
+
+
+def rebuild_grading_status(args):
+    from services import grading_status
+
+    db = SessionLocal()
+    try:
+        count = grading_status.rebuild(db)
+        print(f"Đã cập nhật trạng thái chấm cho {count} bài nộp.")
+    finally:
+        db.close()
+
+
+def rebuild_lesson_content(args):
+    from services import lesson_content
+
+    db = SessionLocal()
+    try:
+        count = lesson_content.rebuild(db)
+        print(f"Đã lưu lại nội dung của {count} bài học.")
+    finally:
+        db.close()
+
+
+def migrate(args):
+    import migrations
+
+    if args.status:
+        for version, name, applied in migrations.status():
+            mark = applied.applied_at.strftime("%Y-%m-%d %H:%M") if applied else "chưa chạy"
+            print(f"  {version:>3} {name:<24} {mark}")
+        return
+    done = migrations.migrate(target=args.to)
+    print(f"Đã chạy {len(done)} migration." if done else "Cơ sở dữ liệu đã ở phiên bản mới nhất.")
+
+
+def grading_worker(args):
+    import asyncio
+    from services.grading_queue import GradingWorker
+
+    worker = GradingWorker(concurrency=args.concurrency, grader=args.grader and get_grader(args.grader))
+    print(f"Worker chấm bài {worker.worker_id} đang chạy với {worker.concurrency} luồng.")
+
+    async def run():
+        try:
+            await worker.run(stop_when_idle=args.once)
+        finally:
+            await close_client()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    print(f"Đã chấm {worker.processed} bài, {worker.failed} lần lỗi.")
+    print(f"Cache chấm bài: {grading_cache.stats.hits} lần trúng, {grading_cache.stats.misses} lần trượt, "
+          f"tiết kiệm ~{grading_cache.stats.saved_seconds:.1f}s gọi AI.")
+
+
+def grading_cache_command(args):
+    db = SessionLocal()
+    try:
+        if args.clear:
+            db.query(models.GradingCache).delete()
+            db.commit()
+            print("Đã xóa toàn bộ cache chấm bài.")
+        elif args.evict:
+            removed = grading_cache.evict(db)
+            db.commit()
+            print(f"Đã xóa {removed} kết quả cũ khỏi cache chấm bài.")
+        info = grading_cache.summary(db)
+        print(f"Cache chấm bài: {info['entries']} kết quả, {info['hits']} lần dùng lại, "
+              f"tiết kiệm ~{info['saved_seconds']:.1f}s gọi AI.")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Công cụ quản trị IGCSE Hub")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_cmd = commands.add_parser("migrate", help="Nâng cấp lược đồ cơ sở dữ liệu lên phiên bản mới nhất")
+    migrate_cmd.add_argument("--status", action="store_true", help="Chỉ liệt kê các migration và trạng thái")
+    migrate_cmd.add_argument("--to", type=int, default=None, help="Dừng ở phiên bản này")
+    migrate_cmd.set_defaults(func=migrate)
+
+    commands.add_parser("rebuild-revenue", help="Tính lại bảng RevenueDaily từ bảng Payment").set_defaults(func=rebuild_revenue)
+
+    commands.add_parser("rebuild-unread", help="Đếm lại Users.unread_notifications từ bảng Notification").set_defaults(func=rebuild_unread)
+
+    commands.add_parser("rebuild-progress", help="Tính lại bảng StudentProgress từ lịch sử học tập").set_defaults(func=rebuild_progress)
+
+    commands.add_parser("rebuild-user-index", help="Lập lại chỉ mục tìm kiếm người dùng (UserSearchToken)").set_defaults(func=rebuild_user_index)
+
+    commands.add_parser("rebuild-grading-status", help="Tính lại Submission.grading_status từ điểm và người chấm").set_defaults(func=rebuild_grading_status)
+
+    commands.add_parser("rebuild-lesson-content", help="Tính lại kích thước và nén/giải nén nội dung bài học theo LESSON_GZIP").set_defaults(func=rebuild_lesson_content)
+
+    worker = commands.add_parser("grading-worker", help="Chạy worker chấm bài tự luận bằng AI từ bảng GradingJob")
+    worker.add_argument("--concurrency", type=int, default=None, help="Số bài chấm đồng thời (mặc định GRADING_CONCURRENCY)")
+    worker.add_argument("--grader", default=None, help="openai, stub hoặc module:function (mặc định AI_GRADER)")
+    worker.add_argument("--once", action="store_true", help="Dừng khi hàng đợi trống")
+    worker.set_defaults(func=grading_worker)
+
+    cache = commands.add_parser("grading-cache", help="Xem thống kê cache kết quả chấm bài AI")
+    cache.add_argument("--evict", action="store_true", help="Xóa bớt kết quả ít dùng nhất về GRADING_CACHE_SIZE")
+    cache.add_argument("--clear", action="store_true", help="Xóa toàn bộ cache")
+    cache.set_defaults(func=grading_cache_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
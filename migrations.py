@@ -0,0 +1,206 @@
+import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, NVARCHAR, Table, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from database import engine
+import models
+
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", NVARCHAR(200)),
+    Column("applied_at", DateTime),
+)
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+def create_tables(conn, *tables):
+    for table in tables:
+        table.create(conn, checkfirst=True)
+
+
+def add_column(conn, table, name, default=None):
+    if name in {column["name"] for column in inspect(conn).get_columns(table.name)}:
+        return False
+    column = table.c[name]
+    preparer = conn.dialect.identifier_preparer
+    keyword = "ADD COLUMN" if conn.dialect.name == "sqlite" else "ADD"
+    ddl = f"ALTER TABLE {preparer.format_table(table)} {keyword} {preparer.format_column(column)} {column.type.compile(conn.dialect)}"
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.exec_driver_sql(ddl)
+    return True
+
+
+def create_indexes(conn, table, *names):
+    existing = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    wanted = {index.name: index for index in table.indexes}
+    for name in names:
+        if name not in existing:
+            wanted[name].create(conn)
+
+
+@migration(1, "baseline")
+def baseline(conn):
+    # the tables of the original hand-written schema; Notification already
+    # references Announcement, so that one is created alongside it
+    models.Base.metadata.create_all(conn, tables=[model.__table__ for model in (
+        models.User, models.Teacher, models.Parent, models.Student, models.Course, models.Lesson, models.Quiz,
+        models.Question, models.Payment, models.Announcement, models.Notification, models.Assignment,
+        models.Submission, models.QuizSubmission, models.QuizAnswer,
+    )] + [models.parent_student_association])
+
+
+@migration(2, "revenue_daily")
+def revenue_daily(conn):
+    from services import revenue
+
+    create_tables(conn, models.RevenueDaily.__table__)
+    with Session(bind=conn) as db:
+        revenue.rebuild(db)
+
+
+@migration(3, "announcements")
+def announcements(conn):
+    create_tables(conn, models.Announcement.__table__)
+    add_column(conn, models.Notification.__table__, "announcement_id")
+
+
+@migration(4, "unread_counter")
+def unread_counter(conn):
+    from services.notifications import rebuild_unread_counters
+
+    add_column(conn, models.User.__table__, "unread_notifications", default="0")
+    with Session(bind=conn) as db:
+        rebuild_unread_counters(db)
+
+
+@migration(5, "grading_jobs")
+def grading_jobs(conn):
+    create_tables(conn, models.GradingJob.__table__)
+
+
+@migration(6, "grading_cache")
+def grading_cache(conn):
+    create_tables(conn, models.GradingCache.__table__)
+
+
+@migration(7, "user_search_index")
+def user_search_index(conn):
+    from services import user_search
+
+    add_column(conn, models.User.__table__, "search_text")
+    create_tables(conn, models.UserSearchToken.__table__)
+    with Session(bind=conn) as db:
+        user_search.rebuild(db)
+
+
+@migration(8, "student_progress")
+def student_progress(conn):
+    from services import progress
+
+    create_tables(conn, models.LessonView.__table__, models.StudentProgress.__table__)
+    with Session(bind=conn) as db:
+        progress.rebuild(db)
+
+
+@migration(9, "grading_status")
+def submission_grading_status(conn):
+    from services import grading_status
+
+    add_column(conn, models.Submission.__table__, "grading_status", default="'pending'")
+    create_indexes(conn, models.Course.__table__, "ix_Course_teacher_id")
+    create_indexes(conn, models.Assignment.__table__, "ix_Assignment_course_id")
+    create_indexes(conn, models.Submission.__table__, "ix_Submission_assignment_status_submitted")
+    with Session(bind=conn) as db:
+        grading_status.rebuild(db)
+
+
+@migration(10, "hot_path_indexes")
+def hot_path_indexes(conn):
+    create_indexes(conn, models.Payment.__table__,
+                   "ix_Payment_student_course_status", "ix_Payment_course_status_student", "ix_Payment_date")
+    create_indexes(conn, models.Notification.__table__,
+                   "ix_Notification_user_read_created", "ix_Notification_user_created")
+    create_indexes(conn, models.Submission.__table__,
+                   "ix_Submission_assignment_student", "ix_Submission_student_submitted")
+    create_indexes(conn, models.QuizSubmission.__table__,
+                   "ix_QuizSubmission_student_submitted", "ix_QuizSubmission_quiz_student")
+    create_indexes(conn, models.QuizAnswer.__table__, "ux_QuizAnswer_submission_question")
+    create_indexes(conn, models.Question.__table__, "ix_Question_quiz_id")
+    create_indexes(conn, models.Lesson.__table__, "ix_Lesson_course_id")
+    create_indexes(conn, models.Quiz.__table__, "ix_Quiz_course_id")
+
+
+@migration(11, "course_updated_at")
+def course_updated_at(conn):
+    course = models.Course.__table__
+    add_column(conn, course, "updated_at")
+    conn.execute(course.update().where(course.c.updated_at.is_(None)).values(updated_at=datetime.datetime.utcnow()))
+
+
+@migration(12, "lesson_content_storage")
+def lesson_content_storage(conn):
+    from services import lesson_content
+
+    add_column(conn, models.Lesson.__table__, "content_gzip")
+    add_column(conn, models.Lesson.__table__, "content_size")
+    with Session(bind=conn) as db:
+        lesson_content.rebuild(db)
+
+
+@migration(13, "grading_cache_keep_case")
+def grading_cache_keep_case(conn):
+    # answer hashes used to be taken after casefolding; those entries could
+    # hand one student's grade to a differently-cased answer
+    conn.execute(models.GradingCache.__table__.delete())
+
+
+@migration(14, "user_search_underscore_names")
+def user_search_underscore_names(conn):
+    from services import user_search
+
+    # names are now split on "_" like email addresses, so re-index the few that contain one
+    with Session(bind=conn) as db:
+        for user in db.query(models.User).filter(models.User.fullname.like("%\\_%", escape="\\")):
+            user_search.index_user(db, user)
+        db.commit()
+
+
+def applied_versions(conn):
+    schema_version.create(conn, checkfirst=True)
+    return {row.version: row for row in conn.execute(select(schema_version))}
+
+
+def status(bind=None):
+    with (bind or engine).begin() as conn:
+        applied = applied_versions(conn)
+    return [(version, name, applied.get(version)) for version, name, _ in sorted(MIGRATIONS, key=lambda m: m[0])]
+
+
+def migrate(bind=None, target=None, log=print):
+    bind = bind or engine
+    with bind.begin() as conn:
+        applied = applied_versions(conn)
+
+    done = []
+    for version, name, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied or (target is not None and version > target):
+            continue
+        with bind.begin() as conn:
+            fn(conn)
+            conn.execute(insert(schema_version).values(version=version, name=name, applied_at=datetime.datetime.utcnow()))
+        log(f"  {version:>3} {name}")
+        done.append(version)
+    return done
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, Float, DateTime, Boolean, ForeignKey, NVARCHAR, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Float, Date, DateTime, Boolean, ForeignKey, LargeBinary, NVARCHAR, String, Table, Index
+from sqlalchemy.orm import deferred, relationship
 from database import Base
 import datetime
 
@@ -18,6 +18,8 @@ class User(Base):
     password_hash = Column(NVARCHAR(255))
     role = Column(NVARCHAR(20))
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    unread_notifications = Column(Integer, default=0, nullable=False)
+    search_text = Column(NVARCHAR(400), nullable=True)
 
     teacher_profile = relationship("Teacher", back_populates="user", uselist=False, cascade="all, delete-orphan")
     student_profile = relationship("Student", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -25,6 +27,14 @@ class User(Base):
     
     notifications = relationship("Notification", back_populates="user")
 
+class UserSearchToken(Base):
+    __tablename__ = "UserSearchToken"
+    __table_args__ = (Index("ix_UserSearchToken_token_role", "token", "role", "user_id"),)
+
+    user_id = Column(Integer, ForeignKey("Users.user_id"), primary_key=True)
+    token = Column(String(32), primary_key=True)
+    role = Column(NVARCHAR(20))
+
 class Teacher(Base):
     __tablename__ = "Teachers"
     
@@ -70,7 +80,8 @@ class Course(Base):
     description = Column(NVARCHAR)
     price = Column(Float)
     status = Column(NVARCHAR(20), default='active')
-    teacher_id = Column(Integer, ForeignKey("Teachers.teacher_id"))
+    teacher_id = Column(Integer, ForeignKey("Teachers.teacher_id"), index=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     teacher = relationship("Teacher", back_populates="courses")
     lessons = relationship("Lesson", back_populates="course", cascade="all, delete-orphan")
@@ -83,8 +94,10 @@ class Lesson(Base):
     
     lesson_id = Column(Integer, primary_key=True, index=True)
     title = Column(NVARCHAR(200))
-    content = Column(NVARCHAR)
-    course_id = Column(Integer, ForeignKey("Course.course_id"))
+    content = deferred(Column(NVARCHAR))
+    content_gzip = deferred(Column(LargeBinary))
+    content_size = Column(Integer)
+    course_id = Column(Integer, ForeignKey("Course.course_id"), index=True)
     
     course = relationship("Course", back_populates="lessons")
 
@@ -94,7 +107,7 @@ class Quiz(Base):
     quiz_id = Column(Integer, primary_key=True, index=True)
     title = Column(NVARCHAR(200))
     duration = Column(Integer)
-    course_id = Column(Integer, ForeignKey("Course.course_id"))
+    course_id = Column(Integer, ForeignKey("Course.course_id"), index=True)
     lesson_id = Column(Integer, ForeignKey("Lesson.lesson_id"), nullable=True)
     
     course = relationship("Course", back_populates="quizzes")
@@ -104,7 +117,7 @@ class Question(Base):
     __tablename__ = "Question"
     
     question_id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("Quiz.quiz_id"))
+    quiz_id = Column(Integer, ForeignKey("Quiz.quiz_id"), index=True)
     content = Column(NVARCHAR)
     question_type = Column(NVARCHAR(20))
     
@@ -118,6 +131,11 @@ class Question(Base):
 
 class Payment(Base):
     __tablename__ = "Payment"
+    __table_args__ = (
+        Index("ix_Payment_student_course_status", "student_id", "course_id", "status"),
+        Index("ix_Payment_course_status_student", "course_id", "status", "student_id"),
+        Index("ix_Payment_date", "payment_date", "payment_id"),
+    )
     
     payment_id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("Students.student_id"))
@@ -131,17 +149,41 @@ class Payment(Base):
 
 class Notification(Base):
     __tablename__ = "Notification"
+    __table_args__ = (
+        Index("ix_Notification_user_read_created", "user_id", "is_read", "created_at"),
+        Index("ix_Notification_user_created", "user_id", "created_at", "notification_id"),
+    )
     
     notification_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("Users.user_id"))
     message = Column(NVARCHAR)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     is_read = Column(Boolean, default=False)
+    announcement_id = Column(Integer, ForeignKey("Announcement.announcement_id"), nullable=True)
     
     user = relationship("User", back_populates="notifications")
 
+class Announcement(Base):
+    __tablename__ = "Announcement"
+
+    announcement_id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("Course.course_id"))
+    teacher_id = Column(Integer, ForeignKey("Teachers.teacher_id"))
+    message = Column(NVARCHAR)
+    status = Column(NVARCHAR(20), default='pending')
+    recipient_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
+
+    course = relationship("Course")
+
 class Submission(Base):
     __tablename__ = "Submission"
+    __table_args__ = (
+        Index("ix_Submission_assignment_status_submitted", "assignment_id", "grading_status", "submitted_at"),
+        Index("ix_Submission_assignment_student", "assignment_id", "student_id"),
+        Index("ix_Submission_student_submitted", "student_id", "submitted_at"),
+    )
 
     submission_id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("Assignment.assignment_id"))
@@ -152,8 +194,40 @@ class Submission(Base):
     teacher_feedback = Column(NVARCHAR, nullable=True)
     graded_by = Column(NVARCHAR(50), nullable=True)
     submitted_at = Column(DateTime, default=datetime.datetime.utcnow)
+    grading_status = Column(NVARCHAR(20), default='pending', nullable=False)
 
     student = relationship("Student", back_populates="submissions")
+    assignment = relationship("Assignment")
+    grading_job = relationship("GradingJob", back_populates="submission", uselist=False)
+
+class GradingJob(Base):
+    __tablename__ = "GradingJob"
+    __table_args__ = (Index("ix_GradingJob_status_next_run_at", "status", "next_run_at"),)
+
+    job_id = Column(Integer, primary_key=True, index=True)
+    submission_id = Column(Integer, ForeignKey("Submission.submission_id"), unique=True)
+    status = Column(NVARCHAR(20), default='queued')
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    next_run_at = Column(DateTime, default=datetime.datetime.utcnow)
+    locked_by = Column(NVARCHAR(100), nullable=True)
+    last_error = Column(NVARCHAR, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    submission = relationship("Submission", back_populates="grading_job")
+
+class GradingCache(Base):
+    __tablename__ = "GradingCache"
+
+    assignment_id = Column(Integer, ForeignKey("Assignment.assignment_id"), primary_key=True)
+    answer_hash = Column(String(64), primary_key=True)
+    score = Column(Float)
+    feedback = Column(NVARCHAR)
+    grade_seconds = Column(Float, default=0)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
 
 class Assignment(Base):
     __tablename__ = "Assignment"
@@ -162,12 +236,16 @@ class Assignment(Base):
     title = Column(NVARCHAR(200))
     max_score = Column(Float)
     content = Column(NVARCHAR)
-    course_id = Column(Integer, ForeignKey("Course.course_id"))
+    course_id = Column(Integer, ForeignKey("Course.course_id"), index=True)
     
     course = relationship("Course", back_populates="assignments")
 
 class QuizSubmission(Base):
     __tablename__ = "QuizSubmission"
+    __table_args__ = (
+        Index("ix_QuizSubmission_student_submitted", "student_id", "submitted_at"),
+        Index("ix_QuizSubmission_quiz_student", "quiz_id", "student_id"),
+    )
 
     submission_id = Column(Integer, primary_key=True, index=True)
     quiz_id = Column(Integer, ForeignKey("Quiz.quiz_id"))
@@ -181,6 +259,7 @@ class QuizSubmission(Base):
 
 class QuizAnswer(Base):
     __tablename__ = "QuizAnswer"
+    __table_args__ = (Index("ux_QuizAnswer_submission_question", "submission_id", "question_id", unique=True),)
     
     answer_id = Column(Integer, primary_key=True, index=True)
     submission_id = Column(Integer, ForeignKey("QuizSubmission.submission_id"))
@@ -189,4 +268,37 @@ class QuizAnswer(Base):
     is_correct = Column(Boolean)
     
     submission = relationship("QuizSubmission", back_populates="answers")
-    question = relationship("Question")
\ No newline at end of file
+    question = relationship("Question")
+
+class RevenueDaily(Base):
+    __tablename__ = "RevenueDaily"
+
+    day = Column(Date, primary_key=True)
+    course_id = Column(Integer, ForeignKey("Course.course_id"), primary_key=True)
+    teacher_id = Column(Integer, ForeignKey("Teachers.teacher_id"), nullable=True, index=True)
+    total_amount = Column(Float, default=0)
+    payment_count = Column(Integer, default=0)
+
+    course = relationship("Course")
+
+class LessonView(Base):
+    __tablename__ = "LessonView"
+
+    student_id = Column(Integer, ForeignKey("Students.student_id"), primary_key=True)
+    lesson_id = Column(Integer, ForeignKey("Lesson.lesson_id"), primary_key=True)
+    viewed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class StudentProgress(Base):
+    __tablename__ = "StudentProgress"
+
+    student_id = Column(Integer, ForeignKey("Students.student_id"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("Course.course_id"), primary_key=True)
+    lessons_viewed = Column(Integer, default=0)
+    quizzes_attempted = Column(Integer, default=0)
+    quiz_attempts = Column(Integer, default=0)
+    best_quiz_score = Column(Float, nullable=True)
+    latest_quiz_score = Column(Float, nullable=True)
+    assignments_submitted = Column(Integer, default=0)
+    assignments_graded = Column(Integer, default=0)
+    assignment_score_total = Column(Float, default=0)
+    last_activity_at = Column(DateTime, nullable=True)
\ No newline at end of file
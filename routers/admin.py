@@ -1,69 +1,124 @@
 from typing import List, Optional
 from fastapi import APIRouter, Request, Form, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_ 
-from dependencies import get_db, get_current_user
+from sqlalchemy.orm import Session, joinedload, selectinload
+from dependencies import get_db, get_current_user, invalidate_user, CurrentUser
+from templating import templates
+from services.pagination import keyset_page
+from services import revenue
+from services.user_search import filter_users, index_user, remove_user
+import datetime
 import models
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
-templates = Jinja2Templates(directory="templates")
 
-def verify_admin(user: models.User = Depends(get_current_user)):
+def verify_admin(user: CurrentUser = Depends(get_current_user)):
     if not user or user.role != "admin":
         raise HTTPException(status_code=403, detail="Chỉ Admin mới có quyền truy cập")
     return user
 
 @router.get("/financials", response_class=HTMLResponse)
-async def manage_financials(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_admin)):
-    total_revenue = db.query(func.sum(models.Payment.amount)).scalar() or 0
-    transactions = db.query(models.Payment).order_by(models.Payment.payment_date.desc()).all()
+def manage_financials(
+    request: Request, 
+    cursor: Optional[str] = None, 
+    limit: int = 0, 
+    db: Session = Depends(get_db), 
+    user: CurrentUser = Depends(verify_admin)
+):
+    total_revenue, total_transactions = revenue.totals(db)
+    transactions = keyset_page(db.query(models.Payment).options(
+        joinedload(models.Payment.student).joinedload(models.Student.user),
+        joinedload(models.Payment.course)
+    ), [models.Payment.payment_date, models.Payment.payment_id], cursor, limit)
     
     return templates.TemplateResponse("admin_financials.html", {
         "request": request,
         "user": user,
         "total_revenue": round(total_revenue, 2),
+        "total_transactions": total_transactions,
         "transactions": transactions
     })
 
+@router.get("/financials/report", response_class=HTMLResponse)
+def revenue_report(
+    request: Request, 
+    start: Optional[datetime.date] = None, 
+    end: Optional[datetime.date] = None, 
+    db: Session = Depends(get_db), 
+    user: CurrentUser = Depends(verify_admin)
+):
+    if not start and not end:
+        end = datetime.date.today()
+        start = end - datetime.timedelta(days=30)
+
+    return templates.TemplateResponse("admin_revenue_report.html", {
+        "request": request,
+        "user": user,
+        "start": start,
+        "end": end,
+        "report": revenue.report(db, start, end)
+    })
+
+@router.post("/financials/rebuild")
+def rebuild_revenue(db: Session = Depends(get_db), user: CurrentUser = Depends(verify_admin)):
+    revenue.rebuild(db)
+    return RedirectResponse(url="/admin/financials?msg=rebuilt", status_code=302)
+
 @router.get("/users", response_class=HTMLResponse)
-async def manage_users(
+def manage_users(
     request: Request, 
     search: str = "",
+    cursor: Optional[str] = None,
+    limit: int = 0,
     db: Session = Depends(get_db), 
-    user: models.User = Depends(verify_admin)
+    user: CurrentUser = Depends(verify_admin)
 ):
-    query = db.query(models.User)
+    query = db.query(models.User).options(
+        selectinload(models.User.parent_profile).selectinload(models.Parent.children).joinedload(models.Student.user)
+    )
 
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.User.fullname.like(search_term),
-                models.User.email.like(search_term)
-            )
-        )
+        query = filter_users(query, search)
     
-    users = query.all()
-    
-    all_students = db.query(models.Student).join(models.User).filter(models.User.role == 'student').all() 
+    users = keyset_page(query, [models.User.user_id], cursor, limit, descending=False)
 
     return templates.TemplateResponse("admin_users.html", {
         "request": request,
         "user": user,
         "users": users,
-        "all_students": all_students,
         "search_query": search
     })
 
+@router.get("/students/search")
+def search_students(
+    q: str = "",
+    cursor: Optional[str] = None,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(verify_admin)
+):
+    query = db.query(models.Student.student_id, models.Student.student_code, models.User.fullname, models.User.email).join(
+        models.User, models.User.user_id == models.Student.student_id
+    ).filter(models.User.role == 'student')
+    if q:
+        query = filter_users(query, q, role='student')
+
+    page = keyset_page(query, [models.Student.student_id], cursor, limit, descending=False)
+    return {
+        "items": [
+            {"student_id": row.student_id, "student_code": row.student_code, "fullname": row.fullname, "email": row.email}
+            for row in page
+        ],
+        "next_cursor": page.next_cursor
+    }
+
 @router.post("/users/role")
-async def update_user_role(
+def update_user_role(
     user_id: int = Form(...), 
     new_role: str = Form(...), 
-    child_ids: Optional[List[int]] = Form(None), 
+    child_ids: List[int] = Form([]), 
     db: Session = Depends(get_db), 
-    user: models.User = Depends(verify_admin)
+    user: CurrentUser = Depends(verify_admin)
 ):
     target_user = db.query(models.User).filter(models.User.user_id == user_id).first()
     
@@ -74,6 +129,7 @@ async def update_user_role(
         return RedirectResponse(url="/admin/users?error=CannotChangeSelf", status_code=302)
 
     target_user.role = new_role
+    index_user(db, target_user)
 
     if new_role == 'student':
         if not target_user.student_profile:
@@ -112,11 +168,12 @@ async def update_user_role(
                     parent_profile.children.append(student)
 
     db.commit()
+    invalidate_user(user_id)
     return RedirectResponse(url="/admin/users?msg=updated", status_code=302)
 
 
 @router.post("/users/delete")
-async def delete_user(user_id: int = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_admin)):
+def delete_user(user_id: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_admin)):
     target_user = db.query(models.User).filter(models.User.user_id == user_id).first()
     
     if target_user and target_user.user_id != user.user_id:
@@ -127,13 +184,15 @@ async def delete_user(user_id: int = Form(...), db: Session = Depends(get_db), u
         elif target_user.role == 'parent':
             db.query(models.Parent).filter(models.Parent.parent_id == user_id).delete()
             
+        remove_user(db, user_id)
         db.delete(target_user)
         db.commit()
+        invalidate_user(user_id)
         
     return RedirectResponse(url="/admin/users", status_code=302)
 
 @router.get("/settings", response_class=HTMLResponse)
-async def configure_system(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_admin)):
+def configure_system(request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_admin)):
     settings = {
         "maintenance_mode": False,
         "allow_registration": True,
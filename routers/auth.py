@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Request, Form, Depends, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from dependencies import get_db
+from sqlalchemy.orm import Session, joinedload
+from dependencies import get_db, user_cache, CurrentUser
+from templating import templates
+from services.session_token import create_session_token
+from services.user_search import index_user
+import config
 import models
 
 router = APIRouter(tags=["Authentication"])
-templates = Jinja2Templates(directory="templates")
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
@@ -14,14 +16,18 @@ async def login_page(request: Request):
 
 
 @router.post("/login")
-async def login_submit(
+def login_submit(
     request: Request, 
     response: Response, 
     email: str = Form(...), 
     password: str = Form(...), 
     db: Session = Depends(get_db)
 ):
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = db.query(models.User).options(
+        joinedload(models.User.student_profile),
+        joinedload(models.User.teacher_profile),
+        joinedload(models.User.parent_profile)
+    ).filter(models.User.email == email).first()
     
     if not user or user.password_hash != password:
         return templates.TemplateResponse("login.html", {
@@ -43,14 +49,17 @@ async def login_submit(
     
     resp = RedirectResponse(url=redirect_url, status_code=status.HTTP_302_FOUND)
     
-    resp.set_cookie(key="user_id", value=str(user.user_id), httponly=True)
+    current = CurrentUser.from_model(user)
+    user_cache.set(current.user_id, current)
+    token = create_session_token(current.user_id, current.role, current.profile_id)
+    resp.set_cookie(key=config.SESSION_COOKIE_NAME, value=token, httponly=True, samesite="lax", max_age=config.SESSION_MAX_AGE)
     
     return resp
 
 @router.get("/logout")
 async def logout(response: Response):
     resp = RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
-    resp.delete_cookie("user_id")
+    resp.delete_cookie(config.SESSION_COOKIE_NAME)
     return resp
 
 @router.get("/forgot-password", response_class=HTMLResponse)
@@ -58,7 +67,7 @@ async def forgot_password_page(request: Request):
     return templates.TemplateResponse("forgot_password.html", {"request": request, "error": None})
 
 @router.post("/forgot-password")
-async def forgot_password_submit(
+def forgot_password_submit(
     request: Request, 
     email: str = Form(...), 
     db: Session = Depends(get_db)
@@ -78,7 +87,7 @@ async def forgot_password_submit(
     })
 
 @router.post("/reset-password")
-async def reset_password_submit(
+def reset_password_submit(
     request: Request,
     user_id: int = Form(...),
     new_password: str = Form(...),
@@ -109,7 +118,7 @@ async def register_page(request: Request):
     return templates.TemplateResponse("register.html", {"request": request, "error": None})
 
 @router.post("/register")
-async def register_submit(
+def register_submit(
     request: Request,
     fullname: str = Form(...),
     email: str = Form(...),
@@ -142,19 +151,17 @@ async def register_submit(
             role="student" 
         )
         db.add(new_user)
-        db.commit()
-        
-        db.refresh(new_user) 
+        db.flush()
 
         student_code = f"HS{new_user.user_id:04d}" 
         
         new_student = models.Student(
             student_id=new_user.user_id,
             student_code=student_code,
-            grade_level="Chưa cập nhật",
-            parent_id=None
+            grade_level="Chưa cập nhật"
         )
         db.add(new_student)
+        index_user(db, new_user)
         db.commit()
         
         return templates.TemplateResponse("login.html", {
@@ -1,17 +1,17 @@
-from fastapi import APIRouter, Request, Form, Depends, status
+from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, load_current_user, invalidate_user, CurrentUser
+from templating import templates
+from services.user_search import index_user
 import models
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
-templates = Jinja2Templates(directory="templates")
 
 @router.get("/", response_class=HTMLResponse)
 async def view_profile(
     request: Request, 
-    user: models.User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     msg: str = None
 ):
     if not user:
@@ -24,23 +24,26 @@ async def view_profile(
     })
 
 @router.post("/update")
-async def update_profile(
+def update_profile(
     request: Request,
     fullname: str = Form(...),
     password: str = Form(None),
     db: Session = Depends(get_db),
-    user: models.User = Depends(get_current_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     if not user:
         return RedirectResponse("/login")
 
-    user.fullname = fullname.strip()
+    db_user = db.query(models.User).filter(models.User.user_id == user.user_id).first()
+    db_user.fullname = fullname.strip()
     
     if password and password.strip():
-        user.password_hash = password.strip()
+        db_user.password_hash = password.strip()
         
+    index_user(db, db_user)
     db.commit()
-    db.refresh(user)
+    invalidate_user(user.user_id)
+    user = load_current_user(db, user.user_id)
     
     return templates.TemplateResponse("profile.html", {
         "request": request, 
@@ -1,70 +1,34 @@
-from fastapi import APIRouter, Request, Form, Depends, HTTPException, status, BackgroundTasks
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from dependencies import get_db, get_current_user
+from fastapi import APIRouter, Request, Form, Depends, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import insert
+from dependencies import get_db, get_current_user, CurrentUser
+from templating import templates
+from services.pagination import keyset_page
+from services import revenue, progress, grading_status, course_content, lesson_content
+from services.notifications import mark_all_read, unread_count
+from services.answer_keys import get_answer_key, score_answers
+from services.grading_queue import submit_for_grading
+from services.catalog import get_catalog, owned_course_ids, owns_course
+import config
 import models
 import datetime
-import traceback
-
-from database import SessionLocal 
-
-from services.ai_grader import grade_submission_with_ai
 
 router = APIRouter(prefix="/student", tags=["Student"])
-templates = Jinja2Templates(directory="templates")
 
-def verify_student(user: models.User = Depends(get_current_user)):
+def verify_student(user: CurrentUser = Depends(get_current_user)):
     if not user or user.role != "student":
         raise HTTPException(status_code=403, detail="Chỉ dành cho Học sinh.")
     return user
 
-def process_ai_grading(submission_id: int, question: str, answer: str):
-    print(f"[Background] Đang chấm AI cho bài nộp #{submission_id}...")
-    
-    try:
-        ai_result = grade_submission_with_ai(question, answer)
-    except Exception as e:
-        print(f"Lỗi khi gọi AI: {e}")
-        return
-
-    db = SessionLocal()
-    try:
-        submission = db.query(models.Submission).filter(models.Submission.submission_id == submission_id).first()
-        if submission:
-            submission.ai_score = ai_result['score']
-            submission.ai_feedback = ai_result['feedback']
-            
-            submission.teacher_score = ai_result['score']
-            submission.teacher_feedback = ai_result['feedback']
-            
-            db.commit()
-            print(f"[Background] Đã lưu điểm bài #{submission_id}: {ai_result['score']}")
-        else:
-            print(f"Không tìm thấy bài nộp #{submission_id} trong DB")
-            
-    except Exception as e:
-        print(f"Lỗi Database trong Background Task: {e}")
-        traceback.print_exc()
-        db.rollback()
-    finally:
-        db.close()
-
 @router.get("/", response_class=HTMLResponse)
-async def student_dashboard(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    student = user.student_profile
-    if not student: return "Lỗi: Tài khoản chưa có hồ sơ học sinh (student_profile)."
-
-    my_courses = db.query(models.Course).join(models.Payment).filter(
-        models.Payment.student_id == student.student_id,
-        models.Payment.status == 'paid'
-    ).all()
+def student_dashboard(request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    if not user.student_id: return "Lỗi: Tài khoản chưa có hồ sơ học sinh (student_profile)."
+
+    my_courses = progress.courses_with_progress(db, user.student_id)
     
-    unread_notifs = db.query(models.Notification).filter(
-        models.Notification.user_id == user.user_id,
-        models.Notification.is_read == False
-    ).count()
+    unread_notifs = unread_count(db, user.user_id)
 
     return templates.TemplateResponse("student_dashboard.html", {
         "request": request, "user": user, 
@@ -73,136 +37,157 @@ async def student_dashboard(request: Request, db: Session = Depends(get_db), use
     })
 
 @router.get("/courses", response_class=HTMLResponse)
-async def course_catalog(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    all_courses = db.query(models.Course).filter(models.Course.status == 'active').all()
-    
-    student = user.student_profile
-    if not student: return RedirectResponse("/student")
+def course_catalog(request: Request, q: str = None, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    if not user.student_id: return RedirectResponse("/student")
 
-    paid_courses = db.query(models.Payment.course_id).filter(
-        models.Payment.student_id == student.student_id,
-        models.Payment.status == 'paid'
-    ).all()
-    paid_ids = [c[0] for c in paid_courses]
+    catalog = get_catalog(db)
+    courses = catalog.search(q) if q else catalog.courses
 
     return templates.TemplateResponse("student_courses.html", {
         "request": request, "user": user, 
-        "courses": all_courses,
-        "paid_ids": paid_ids
+        "courses": courses,
+        "paid_ids": owned_course_ids(db, user.student_id),
+        "q": q or ""
     })
 
+@router.get("/courses/search")
+def search_courses(
+    q: str = None, min_price: float = None, max_price: float = None, teacher_id: int = None, owned: bool = None,
+    limit: int = 50, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)
+):
+    paid_ids = owned_course_ids(db, user.student_id) if user.student_id else frozenset()
+    results = get_catalog(db).search(q, min_price, max_price, teacher_id, paid_ids, owned)
+    limit = max(1, min(limit, config.MAX_PAGE_SIZE))
+    return {
+        "total": len(results),
+        "courses": [dict(course.to_dict(), owned=course.course_id in paid_ids) for course in results[:limit]]
+    }
+
 @router.post("/course/buy")
-async def buy_course(course_id: int = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    student = user.student_profile
-    if not student: return RedirectResponse("/student")
+def buy_course(course_id: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    if not user.student_id: return RedirectResponse("/student")
 
     course = db.query(models.Course).get(course_id)
     
     if course:
         existing = db.query(models.Payment).filter(
-            models.Payment.student_id == student.student_id, 
+            models.Payment.student_id == user.student_id, 
             models.Payment.course_id == course_id
         ).first()
         
         if not existing:
             new_payment = models.Payment(
-                student_id=student.student_id,
+                student_id=user.student_id,
                 course_id=course_id,
                 amount=course.price,
                 status='paid',
                 payment_date=datetime.datetime.utcnow()
             )
             db.add(new_payment)
+            revenue.record_payment(db, new_payment, course.teacher_id)
             db.commit()
     
     return RedirectResponse(url="/student?msg=bought_success", status_code=302)
 
 @router.get("/learn/{course_id}", response_class=HTMLResponse)
-async def learn_course(course_id: int, request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    student = user.student_profile
-    if not student: return RedirectResponse("/student")
+def learn_course(course_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    if not user.student_id: return RedirectResponse("/student")
     
-    payment = db.query(models.Payment).filter(
-        models.Payment.student_id == student.student_id,
-        models.Payment.course_id == course_id,
-        models.Payment.status == 'paid'
-    ).first()
-    
-    if not payment:
+    if not owns_course(db, user.student_id, course_id):
         return RedirectResponse("/student/courses?msg=need_buy")
 
-    course = db.query(models.Course).get(course_id)
+    version = course_content.content_version(db, course_id)
+    if version is None:
+        return RedirectResponse("/student/courses")
+
+    headers = course_content.validators(course_id, version, user)
+    if course_content.not_modified(request, headers, version):
+        return Response(status_code=304, headers=headers)
+
     return templates.TemplateResponse("student_learn.html", {
-        "request": request, "user": user, "course": course
-    })
+        "request": request, "user": user, "content": course_content.render_content(db, course_id, version)
+    }, headers=headers)
+
+@router.get("/lesson/{lesson_id}")
+def lesson_body(lesson_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    lesson = lesson_content.lesson_version(db, lesson_id)
+    if not lesson or not user.student_id or not owns_course(db, user.student_id, lesson.course_id):
+        raise HTTPException(status_code=404, detail="Không tìm thấy bài học.")
+    return lesson_content.body_response(db, request, lesson)
+
+@router.post("/lesson/{lesson_id}/view")
+def view_lesson(lesson_id: int, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    lesson = db.query(models.Lesson.lesson_id, models.Lesson.course_id).filter(models.Lesson.lesson_id == lesson_id).first()
+    if not lesson or not user.student_id or not owns_course(db, user.student_id, lesson.course_id):
+        raise HTTPException(status_code=404, detail="Không tìm thấy bài học.")
+
+    first_view = progress.record_lesson_view(db, user.student_id, lesson)
+    db.commit()
+    return {"lesson_id": lesson_id, "first_view": first_view}
 
 @router.get("/quiz/take/{quiz_id}", response_class=HTMLResponse)
-async def take_quiz(quiz_id: int, request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    quiz = db.query(models.Quiz).get(quiz_id)
+def take_quiz(quiz_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    quiz = db.query(models.Quiz).options(
+        selectinload(models.Quiz.questions)
+    ).filter(models.Quiz.quiz_id == quiz_id).first()
     if not quiz: return RedirectResponse("/student")
     
     return templates.TemplateResponse("student_take_quiz.html", {
         "request": request, "user": user, "quiz": quiz
     })
 
+def save_quiz_submission(db: Session, quiz_id: int, user: CurrentUser, form_data):
+    answer_key = get_answer_key(db, quiz_id)
+    if answer_key is None or not user.student_id: return None
+
+    final_score, answers = score_answers(answer_key, form_data)
+    first_attempt = db.query(models.QuizSubmission.submission_id).filter(
+        models.QuizSubmission.quiz_id == quiz_id,
+        models.QuizSubmission.student_id == user.student_id
+    ).first() is None
+
+    new_submission = models.QuizSubmission(
+        quiz_id=quiz_id,
+        student_id=user.student_id,
+        score=final_score,
+        submitted_at=datetime.datetime.utcnow()
+    )
+    db.add(new_submission)
+    db.flush()
+
+    if answers:
+        for answer in answers:
+            answer["submission_id"] = new_submission.submission_id
+        db.execute(insert(models.QuizAnswer), answers)
+
+    progress.record_quiz_attempt(db, user.student_id, progress.quiz_course_id(db, quiz_id), final_score, first_attempt)
+    db.commit()
+    return new_submission.submission_id
+
 @router.post("/quiz/submit/{quiz_id}")
 async def submit_quiz(
     quiz_id: int, 
     request: Request, 
     db: Session = Depends(get_db), 
-    user: models.User = Depends(verify_student)
+    user: CurrentUser = Depends(verify_student)
 ):
     try:
         form_data = await request.form()
-        quiz = db.query(models.Quiz).get(quiz_id)
-        student = user.student_profile
-        
-        if not quiz or not student: return RedirectResponse("/student")
-
-        new_submission = models.QuizSubmission(
-            quiz_id=quiz_id,
-            student_id=student.student_id,
-            score=0,
-            submitted_at=datetime.datetime.utcnow()
-        )
-        db.add(new_submission)
-        db.commit()
-        db.refresh(new_submission)
-
-        correct_count = 0
-        total_questions = len(quiz.questions)
-
-        for q in quiz.questions:
-            selected_option = form_data.get(f"q_{q.question_id}")
-            
-            is_correct = False
-            if selected_option and selected_option == q.correct_answer:
-                is_correct = True
-                correct_count += 1
-            
-            db.add(models.QuizAnswer(
-                submission_id=new_submission.submission_id,
-                question_id=q.question_id,
-                selected_option=selected_option,
-                is_correct=is_correct
-            ))
-
-        final_score = 0
-        if total_questions > 0:
-            final_score = round((correct_count / total_questions) * 10, 2)
-        
-        new_submission.score = final_score
-        db.commit()
+        submission_id = await run_in_threadpool(save_quiz_submission, db, quiz_id, user, form_data)
+        if not submission_id: return RedirectResponse("/student")
         
-        return RedirectResponse(url=f"/student/quiz/result/{new_submission.submission_id}?msg=success", status_code=302)
+        return RedirectResponse(url=f"/student/quiz/result/{submission_id}?msg=success", status_code=302)
 
     except Exception as e:
         print(f"LỖI KHI NỘP QUIZ: {e}")
         return f"Lỗi Server: {e}"
 
 @router.get("/quiz/result/{submission_id}", response_class=HTMLResponse)
-async def quiz_result(submission_id: int, request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    submission = db.query(models.QuizSubmission).filter(models.QuizSubmission.submission_id == submission_id).first()
+def quiz_result(submission_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    submission = db.query(models.QuizSubmission).options(
+        joinedload(models.QuizSubmission.quiz),
+        selectinload(models.QuizSubmission.answers).joinedload(models.QuizAnswer.question)
+    ).filter(models.QuizSubmission.submission_id == submission_id).first()
     if not submission: return RedirectResponse("/student")
 
     return templates.TemplateResponse("student_quiz_result.html", {
@@ -210,14 +195,13 @@ async def quiz_result(submission_id: int, request: Request, db: Session = Depend
     })
 
 @router.get("/assignment/{assign_id}", response_class=HTMLResponse)
-async def view_assignment(assign_id: int, request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
+def view_assignment(assign_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
     assign = db.query(models.Assignment).get(assign_id)
-    student = user.student_profile
-    if not student: return RedirectResponse("/student")
+    if not user.student_id: return RedirectResponse("/student")
     
     submission = db.query(models.Submission).filter(
         models.Submission.assignment_id == assign_id,
-        models.Submission.student_id == student.student_id
+        models.Submission.student_id == user.student_id
     ).first()
 
     return templates.TemplateResponse("student_do_assignment.html", {
@@ -225,15 +209,13 @@ async def view_assignment(assign_id: int, request: Request, db: Session = Depend
     })
 
 @router.post("/assignment/submit")
-async def submit_assignment(
-    background_tasks: BackgroundTasks,
+def submit_assignment(
     assignment_id: int = Form(...), 
     answer: str = Form(...), 
     db: Session = Depends(get_db), 
-    user: models.User = Depends(verify_student)
+    user: CurrentUser = Depends(verify_student)
 ):
-    student = user.student_profile
-    if not student: return RedirectResponse("/student")
+    if not user.student_id: return RedirectResponse("/student")
 
     assignment = db.query(models.Assignment).get(assignment_id)
     if not assignment:
@@ -241,44 +223,40 @@ async def submit_assignment(
 
     submission = db.query(models.Submission).filter(
         models.Submission.assignment_id == assignment_id,
-        models.Submission.student_id == student.student_id
+        models.Submission.student_id == user.student_id
     ).first()
     
+    first_submission = submission is None
+    previous_score = submission.teacher_score if submission else None
     if submission:
         submission.answer = answer
         submission.submitted_at = datetime.datetime.utcnow()
         submission.ai_score = None 
         submission.teacher_score = None
+        submission.grading_status = grading_status.PENDING
     else:
         submission = models.Submission(
             assignment_id=assignment_id,
-            student_id=student.student_id,
+            student_id=user.student_id,
             answer=answer,
             submitted_at=datetime.datetime.utcnow()
         )
         db.add(submission)
     
+    db.flush()
+    progress.record_assignment_submission(db, user.student_id, assignment.course_id, first_submission, previous_score)
+    submit_for_grading(db, submission)
     db.commit()
-    db.refresh(submission)
-
-    question_text = getattr(assignment, 'description', getattr(assignment, 'content', getattr(assignment, 'title', 'Không có đề bài')))
-
-    background_tasks.add_task(
-        process_ai_grading, 
-        submission.submission_id, 
-        question_text,
-        answer
-    )
     
     return RedirectResponse(url=f"/student/assignment/{assignment_id}?msg=submitted_ai_processing", status_code=302)
 
 @router.get("/notifications", response_class=HTMLResponse)
-async def student_notifications(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_student)):
-    notifs = db.query(models.Notification).filter(models.Notification.user_id == user.user_id).order_by(desc(models.Notification.created_at)).all()
-    
-    for n in notifs:
-        if not n.is_read: n.is_read = True
-    db.commit()
+def student_notifications(request: Request, cursor: str = None, limit: int = 0, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_student)):
+    mark_all_read(db, user.user_id)
+    notifs = keyset_page(
+        db.query(models.Notification).filter(models.Notification.user_id == user.user_id),
+        [models.Notification.created_at, models.Notification.notification_id], cursor, limit
+    )
 
     return templates.TemplateResponse("student_notifications.html", {
         "request": request, "user": user, "notifications": notifs
@@ -1,32 +1,35 @@
-from fastapi import APIRouter, Request, Form, Depends, HTTPException, status
+from fastapi import APIRouter, Request, Form, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from dependencies import get_db, get_current_user
+from sqlalchemy.orm import Session, joinedload, selectinload
+from dependencies import get_db, get_current_user, CurrentUser
+from templating import templates
+from services.pagination import keyset_page
+from services.notifications import mark_all_read, unread_count
+from services.announcements import create_announcement, deliver_announcement
+from services.grading_queue import enqueue
+from services.grading_cache import invalidate_assignment
+from services import progress, grading_status, lesson_content
 import models
 
 router = APIRouter(prefix="/teacher", tags=["Teacher"])
-templates = Jinja2Templates(directory="templates")
 
-def verify_teacher(user: models.User = Depends(get_current_user)):
+def verify_teacher(user: CurrentUser = Depends(get_current_user)):
     if not user or user.role != "teacher":
         raise HTTPException(status_code=403, detail="Chỉ Giáo viên mới có quyền này.")
     return user
 
 @router.get("/", response_class=HTMLResponse)
-async def teacher_dashboard(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
-    teacher = user.teacher_profile
-    if not teacher: return "Lỗi: Chưa có hồ sơ giáo viên."
+def teacher_dashboard(request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    if not user.teacher_id: return "Lỗi: Chưa có hồ sơ giáo viên."
     
-    my_courses = db.query(models.Course).filter(models.Course.teacher_id == teacher.teacher_id).all()
+    my_courses = db.query(models.Course).options(
+        selectinload(models.Course.payments),
+        selectinload(models.Course.lessons)
+    ).filter(models.Course.teacher_id == user.teacher_id).all()
     
-    pending_grading = db.query(models.Submission).filter(models.Submission.teacher_score == None).count()
+    pending_grading = grading_status.pending_count(db, user.teacher_id)
     
-    unread_notifs = db.query(models.Notification).filter(
-        models.Notification.user_id == user.user_id,
-        models.Notification.is_read == False
-    ).count()
+    unread_notifs = unread_count(db, user.user_id)
 
     return templates.TemplateResponse("teacher_dashboard.html", {
         "request": request, 
@@ -37,80 +40,83 @@ async def teacher_dashboard(request: Request, db: Session = Depends(get_db), use
     })
 
 @router.get("/notifications", response_class=HTMLResponse)
-async def view_notifications(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
-    notifs = db.query(models.Notification).filter(
+def view_notifications(request: Request, cursor: str = None, limit: int = 0, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    mark_all_read(db, user.user_id)
+    notifs = keyset_page(db.query(models.Notification).filter(
         models.Notification.user_id == user.user_id
-    ).order_by(desc(models.Notification.created_at)).all()
-    
-    for n in notifs:
-        if not n.is_read:
-            n.is_read = True
-    db.commit()
+    ), [models.Notification.created_at, models.Notification.notification_id], cursor, limit)
 
     return templates.TemplateResponse("teacher_notifications.html", {
         "request": request, "user": user, "notifications": notifs
     })
 
 @router.get("/course/{course_id}", response_class=HTMLResponse)
-async def manage_course_content(course_id: int, request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
-    course = db.query(models.Course).filter(models.Course.course_id == course_id, models.Course.teacher_id == user.user_id).first()
+def manage_course_content(course_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    course = db.query(models.Course).options(
+        selectinload(models.Course.lessons),
+        selectinload(models.Course.quizzes),
+        selectinload(models.Course.assignments)
+    ).filter(models.Course.course_id == course_id, models.Course.teacher_id == user.user_id).first()
     if not course: return RedirectResponse("/teacher")
     
     return templates.TemplateResponse("teacher_course_detail.html", {"request": request, "user": user, "course": course})
 
+@router.get("/lesson/{lesson_id}")
+def lesson_body(lesson_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    lesson = lesson_content.lesson_version(db, lesson_id)
+    if not lesson or lesson.teacher_id != user.user_id:
+        raise HTTPException(status_code=404, detail="Không tìm thấy bài học.")
+    return lesson_content.body_response(db, request, lesson)
+
 @router.post("/announcement/send")
-async def send_announcement(
+def send_announcement(
+    background_tasks: BackgroundTasks,
     course_id: int = Form(...), 
     message: str = Form(...), 
     db: Session = Depends(get_db), 
-    user: models.User = Depends(verify_teacher)
+    user: CurrentUser = Depends(verify_teacher)
 ):
     course = db.query(models.Course).filter(models.Course.course_id == course_id, models.Course.teacher_id == user.user_id).first()
     if not course: return RedirectResponse("/teacher")
 
-    students = db.query(models.Student).join(models.Payment).filter(
-        models.Payment.course_id == course_id,
-        models.Payment.status == 'paid'
-    ).all()
-
-    full_message = f"[THÔNG BÁO LỚP {course.title}]: {message}"
-    for stu in students:
-        db.add(models.Notification(user_id=stu.user.user_id, message=full_message, is_read=False))
-    
-    db.commit()
+    announcement_id = create_announcement(db, course, user.teacher_id, message)
+    background_tasks.add_task(deliver_announcement, announcement_id)
     
     return RedirectResponse(url="/teacher?msg=sent_success", status_code=302)
 
 @router.post("/lesson/add")
-async def add_lesson(course_id: int = Form(...), title: str = Form(...), content: str = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
-    db.add(models.Lesson(title=title, content=content, course_id=course_id))
+def add_lesson(course_id: int = Form(...), title: str = Form(...), content: str = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    lesson = models.Lesson(title=title, course_id=course_id)
+    lesson_content.set_content(lesson, content)
+    db.add(lesson)
     db.commit()
     return RedirectResponse(url=f"/teacher/course/{course_id}", status_code=302)
 
 @router.post("/quiz/add")
-async def add_quiz(course_id: int = Form(...), title: str = Form(...), duration: int = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
+def add_quiz(course_id: int = Form(...), title: str = Form(...), duration: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
     db.add(models.Quiz(title=title, duration=duration, course_id=course_id))
     db.commit()
     return RedirectResponse(url=f"/teacher/course/{course_id}", status_code=302)
 
 @router.post("/assignment/add")
-async def add_assignment(course_id: int = Form(...), title: str = Form(...), max_score: float = Form(...), content: str = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
+def add_assignment(course_id: int = Form(...), title: str = Form(...), max_score: float = Form(...), content: str = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
     db.add(models.Assignment(title=title, max_score=max_score, content=content, course_id=course_id))
     db.commit()
     return RedirectResponse(url=f"/teacher/course/{course_id}", status_code=302)
 
 @router.post("/lesson/delete")
-async def delete_lesson(lesson_id: int = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
+def delete_lesson(lesson_id: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
     item = db.query(models.Lesson).get(lesson_id)
     if item:
         course_id = item.course_id
+        progress.forget_lesson(db, item)
         db.delete(item)
         db.commit()
         return RedirectResponse(url=f"/teacher/course/{course_id}", status_code=302)
     return RedirectResponse(url="/teacher", status_code=302)
 
 @router.post("/quiz/delete")
-async def delete_quiz(quiz_id: int = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
+def delete_quiz(quiz_id: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
     item = db.query(models.Quiz).get(quiz_id)
     if item:
         course_id = item.course_id
@@ -121,26 +127,29 @@ async def delete_quiz(quiz_id: int = Form(...), db: Session = Depends(get_db), u
     return RedirectResponse(url="/teacher", status_code=302)
 
 @router.post("/assignment/delete")
-async def delete_assignment(assignment_id: int = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
+def delete_assignment(assignment_id: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
     item = db.query(models.Assignment).get(assignment_id)
     if item:
         course_id = item.course_id
+        invalidate_assignment(db, assignment_id)
         db.delete(item)
         db.commit()
         return RedirectResponse(url=f"/teacher/course/{course_id}", status_code=302)
     return RedirectResponse(url="/teacher", status_code=302)
 
 @router.get("/quiz/{quiz_id}", response_class=HTMLResponse)
-async def manage_quiz_questions(quiz_id: int, request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
-    quiz = db.query(models.Quiz).filter(models.Quiz.quiz_id == quiz_id).first()
+def manage_quiz_questions(quiz_id: int, request: Request, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    quiz = db.query(models.Quiz).options(
+        selectinload(models.Quiz.questions)
+    ).filter(models.Quiz.quiz_id == quiz_id).first()
     if not quiz: return RedirectResponse("/teacher")
     return templates.TemplateResponse("teacher_quiz_detail.html", {"request": request, "user": user, "quiz": quiz})
 
 @router.post("/quiz/question/add")
-async def add_question(
+def add_question(
     quiz_id: int = Form(...), content: str = Form(...), 
     option_a: str = Form(...), option_b: str = Form(...), option_c: str = Form(...), option_d: str = Form(...), 
-    correct_answer: str = Form(...), db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)
+    correct_answer: str = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)
 ):
     db.add(models.Question(
         quiz_id=quiz_id, content=content, question_type="single_choice",
@@ -150,19 +159,40 @@ async def add_question(
     return RedirectResponse(url=f"/teacher/quiz/{quiz_id}", status_code=302)
 
 @router.get("/grading", response_class=HTMLResponse)
-async def grading_list(request: Request, db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)):
-    submissions = db.query(models.Submission).order_by(models.Submission.teacher_score.asc()).all()
-    return templates.TemplateResponse("teacher_grading.html", {"request": request, "user": user, "submissions": submissions})
+def grading_list(request: Request, tab: str = grading_status.PENDING, cursor: str = None, limit: int = 0, db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    if tab not in grading_status.STATUSES:
+        tab = grading_status.PENDING
+    submissions = keyset_page(grading_status.teacher_submissions(db, user.teacher_id, tab).options(
+        joinedload(models.Submission.student).joinedload(models.Student.user),
+        joinedload(models.Submission.grading_job)
+    ), [models.Submission.submitted_at, models.Submission.submission_id], cursor, limit,
+        descending=tab != grading_status.PENDING)
+    return templates.TemplateResponse("teacher_grading.html", {
+        "request": request, "user": user, "submissions": submissions, "tab": tab,
+        "pending_count": grading_status.pending_count(db, user.teacher_id)
+    })
 
 @router.post("/grading/update")
-async def update_grade(
+def update_grade(
     submission_id: int = Form(...), teacher_score: float = Form(...), feedback: str = Form(...), 
-    db: Session = Depends(get_db), user: models.User = Depends(verify_teacher)
+    db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)
 ):
     sub = db.query(models.Submission).get(submission_id)
     if sub:
+        previous_score = sub.teacher_score
         sub.teacher_score = teacher_score
         sub.teacher_feedback = feedback
         sub.graded_by = "Teacher"
+        sub.grading_status = grading_status.GRADED
+        progress.record_assignment_grade(db, sub, previous_score)
+        db.commit()
+    return RedirectResponse(url="/teacher/grading", status_code=302)
+
+@router.post("/grading/retry")
+def retry_grading(submission_id: int = Form(...), db: Session = Depends(get_db), user: CurrentUser = Depends(verify_teacher)):
+    if grading_status.teacher_submissions(db, user.teacher_id).with_entities(models.Submission.submission_id).filter(
+        models.Submission.submission_id == submission_id
+    ).first():
+        enqueue(db, submission_id)
         db.commit()
     return RedirectResponse(url="/teacher/grading", status_code=302)
\ No newline at end of file
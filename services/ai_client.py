@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import httpx
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, burst):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ChatClient:
+    def __init__(self, base_url, api_key, model, timeout=30, concurrency=8, rate_per_second=0, burst=1, transport=None):
+        self.model = model
+        self.calls = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._bucket = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport,
+        )
+
+    async def complete(self, messages, temperature=0.3):
+        if self._bucket:
+            await self._bucket.acquire()
+        async with self._semaphore:
+            response = await self._http.post("/chat/completions", json={
+                "model": self.model,
+                "messages": messages,
+                "temperature": temperature,
+            })
+            response.raise_for_status()
+            self.calls += 1
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    async def aclose(self):
+        await self._http.aclose()
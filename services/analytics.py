@@ -0,0 +1,274 @@
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import case, extract, func, select
+
+from services.cache import TTLCache
+import config
+import models
+
+SCORE_MAX = 10
+SCORE_STEPS = 100
+SCORE_BINS = 10
+PERCENTILES = (25, 50, 90)
+
+_reports = TTLCache(config.ANALYTICS_TTL, 1)
+_report_lock = threading.Lock()
+
+
+class FactTable:
+    __slots__ = ("course", "teacher", "value", "month")
+
+    def __init__(self, course, teacher, value, month):
+        self.course = course
+        self.teacher = teacher
+        self.value = value
+        self.month = month
+
+    @classmethod
+    def from_rows(cls, rows):
+        data = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * 4).reshape(-1, 4)
+        return cls(data[:, 0].astype(np.int64), data[:, 1].astype(np.int64), data[:, 2], data[:, 3].astype(np.int64))
+
+    @classmethod
+    def concat(cls, *tables):
+        return cls(*(np.concatenate([getattr(t, name) for t in tables]) for name in cls.__slots__))
+
+    def __len__(self):
+        return len(self.value)
+
+
+class GroupStats:
+    def __init__(self, keys, counts, means, passed, percentiles, histogram):
+        self.keys = keys
+        self.counts = counts
+        self.means = means
+        self.passed = passed
+        self.percentiles = percentiles
+        self.histogram = histogram
+
+    def rows(self):
+        counts = self.counts.tolist()
+        means = self.means.tolist()
+        passed = self.passed.tolist()
+        percentiles = {p: values.tolist() for p, values in self.percentiles.items()}
+        histogram = self.histogram.tolist()
+        result = {}
+        for i, key in enumerate(self.keys.tolist()):
+            result[key] = {
+                "count": counts[i],
+                "mean": means[i],
+                "pass_rate": passed[i] / counts[i] * 100,
+                "percentiles": {p: percentiles[p][i] for p in percentiles},
+                "histogram": histogram[i],
+            }
+        return result
+
+
+def _month_index(column):
+    return func.coalesce(extract("year", column) * 12 + extract("month", column) - 1, -1)
+
+
+def _month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def load_quiz_scores(db):
+    rows = db.execute(
+        select(
+            models.Quiz.course_id,
+            func.coalesce(models.Course.teacher_id, -1),
+            models.QuizSubmission.score,
+            _month_index(models.QuizSubmission.submitted_at),
+        )
+        .join(models.Quiz, models.Quiz.quiz_id == models.QuizSubmission.quiz_id)
+        .join(models.Course, models.Course.course_id == models.Quiz.course_id)
+        .where(models.QuizSubmission.score.isnot(None))
+    ).all()
+    return FactTable.from_rows(rows)
+
+
+def load_assignment_scores(db):
+    max_score = models.Assignment.max_score
+    rows = db.execute(
+        select(
+            models.Assignment.course_id,
+            func.coalesce(models.Course.teacher_id, -1),
+            case((max_score > 0, models.Submission.teacher_score * 10.0 / max_score), else_=models.Submission.teacher_score),
+            _month_index(models.Submission.submitted_at),
+        )
+        .join(models.Assignment, models.Assignment.assignment_id == models.Submission.assignment_id)
+        .join(models.Course, models.Course.course_id == models.Assignment.course_id)
+        .where(models.Submission.teacher_score.isnot(None))
+    ).all()
+    return FactTable.from_rows(rows)
+
+
+def load_payments(db):
+    rows = db.execute(
+        select(
+            models.Payment.course_id,
+            func.coalesce(models.Course.teacher_id, -1),
+            func.coalesce(models.Payment.amount, 0),
+            _month_index(models.Payment.payment_date),
+        )
+        .join(models.Course, models.Course.course_id == models.Payment.course_id)
+        .where(models.Payment.status == 'paid')
+    ).all()
+    return FactTable.from_rows(rows)
+
+
+def _dense_keys(keys):
+    low = keys.min()
+    span = keys.max() - low + 1
+    if span > 4 * len(keys) + 1024:
+        return np.unique(keys, return_inverse=True)
+    present = np.bincount(keys - low, minlength=span) > 0
+    return np.flatnonzero(present) + low, (np.cumsum(present) - 1)[keys - low]
+
+
+def _value_at_rank(cumulative, rank):
+    return (cumulative <= rank[:, None]).sum(axis=1) / SCORE_STEPS
+
+
+def _percentile(cumulative, counts, percentile):
+    position = (counts - 1) * (percentile / 100.0)
+    lower = np.floor(position)
+    upper = np.minimum(lower + 1, counts - 1)
+    low_value = _value_at_rank(cumulative, lower)
+    return low_value + (_value_at_rank(cumulative, upper) - low_value) * (position - lower)
+
+
+def group_stats(keys, values, pass_mark=None, percentiles=PERCENTILES):
+    pass_mark = config.ANALYTICS_PASS_MARK if pass_mark is None else pass_mark
+    if not len(values):
+        empty = np.empty(0)
+        return GroupStats(np.empty(0, dtype=np.int64), empty, empty, empty,
+                          {p: empty for p in percentiles}, np.empty((0, SCORE_BINS), dtype=np.int64))
+
+    groups, group_index = _dense_keys(keys)
+    size = len(groups)
+    counts = np.bincount(group_index, minlength=size)
+    means = np.bincount(group_index, weights=values, minlength=size) / counts
+    passed = np.bincount(group_index, weights=values >= pass_mark, minlength=size)
+
+    width = SCORE_MAX * SCORE_STEPS + 1
+    steps = np.rint(np.clip(values, 0, SCORE_MAX) * SCORE_STEPS).astype(np.int64)
+    fine = np.bincount(group_index * width + steps, minlength=size * width).reshape(size, width)
+    histogram = fine[:, :-1].reshape(size, SCORE_BINS, -1).sum(axis=2)
+    histogram[:, -1] += fine[:, -1]
+    cumulative = fine.cumsum(axis=1)
+    return GroupStats(
+        groups, counts, means, passed,
+        {p: _percentile(cumulative, counts, p) for p in percentiles},
+        histogram,
+    )
+
+
+def group_totals(keys, values):
+    if not len(keys):
+        return {}
+    groups, inverse = _dense_keys(keys)
+    counts = np.bincount(inverse, minlength=len(groups))
+    totals = np.bincount(inverse, weights=values, minlength=len(groups))
+    return {key: {"count": count, "total": total} for key, count, total in zip(groups.tolist(), counts.tolist(), totals.tolist())}
+
+
+def _overall(table):
+    stats = group_stats(np.zeros(len(table), dtype=np.int64), table.value).rows()
+    return stats.get(0)
+
+
+def build_report(quizzes, assignments, payments, course_names, teacher_names):
+    started = time.perf_counter()
+    scores = FactTable.concat(quizzes, assignments)
+
+    quiz_by_course = group_stats(quizzes.course, quizzes.value).rows()
+    assignment_by_course = group_stats(assignments.course, assignments.value).rows()
+    revenue_by_course = group_totals(payments.course, payments.value)
+    by_teacher = group_stats(scores.teacher, scores.value).rows()
+    revenue_by_teacher = group_totals(payments.teacher, payments.value)
+
+    dated = quizzes.month >= 0
+    quiz_by_month = group_stats(quizzes.month[dated], quizzes.value[dated]).rows()
+    dated = assignments.month >= 0
+    assignment_by_month = group_stats(assignments.month[dated], assignments.value[dated]).rows()
+    dated = payments.month >= 0
+    revenue_by_month = group_totals(payments.month[dated], payments.value[dated])
+
+    courses = []
+    for course_id, (title, teacher_id) in course_names.items():
+        courses.append({
+            "course_id": course_id,
+            "title": title,
+            "teacher_name": teacher_names.get(teacher_id),
+            "quiz": quiz_by_course.get(course_id),
+            "assignment": assignment_by_course.get(course_id),
+            "revenue": revenue_by_course.get(course_id, {"count": 0, "total": 0.0}),
+        })
+
+    teachers = []
+    for teacher_id, stats in by_teacher.items():
+        teachers.append({
+            "teacher_id": teacher_id,
+            "fullname": teacher_names.get(teacher_id, "Chưa có GV"),
+            "scores": stats,
+            "revenue": revenue_by_teacher.get(teacher_id, {"count": 0, "total": 0.0}),
+        })
+    teachers.sort(key=lambda row: row["scores"]["mean"], reverse=True)
+
+    months = sorted(set(quiz_by_month) | set(assignment_by_month) | set(revenue_by_month))
+    trend = [{
+        "month": _month_label(month),
+        "quiz": quiz_by_month.get(month),
+        "assignment": assignment_by_month.get(month),
+        "revenue": revenue_by_month.get(month, {"count": 0, "total": 0.0}),
+    } for month in months]
+
+    return {
+        "summary": {
+            "quiz": _overall(quizzes),
+            "assignment": _overall(assignments),
+            "revenue": float(payments.value.sum()),
+            "payment_count": len(payments),
+        },
+        "courses": courses,
+        "teachers": teachers,
+        "trend": trend,
+        "pass_mark": config.ANALYTICS_PASS_MARK,
+        "rows": len(scores) + len(payments),
+        "compute_seconds": time.perf_counter() - started,
+    }
+
+
+def load_names(db):
+    courses = {
+        course_id: (title, teacher_id)
+        for course_id, title, teacher_id in db.execute(
+            select(models.Course.course_id, models.Course.title, models.Course.teacher_id).order_by(models.Course.course_id)
+        )
+    }
+    teachers = dict(db.execute(
+        select(models.Teacher.teacher_id, models.User.fullname).join(models.User, models.User.user_id == models.Teacher.teacher_id)
+    ).all())
+    return courses, teachers
+
+
+def get_report(db):
+    report = _reports.get("report")
+    if report is not None:
+        return report
+    with _report_lock:
+        report = _reports.get("report")
+        if report is None:
+            course_names, teacher_names = load_names(db)
+            report = build_report(load_quiz_scores(db), load_assignment_scores(db), load_payments(db), course_names, teacher_names)
+            report["built_at"] = time.time()
+            _reports.set("report", report)
+    return report
+
+
+def invalidate_report():
+    _reports.clear()
@@ -0,0 +1,65 @@
+import datetime
+import traceback
+
+from sqlalchemy import false, insert, literal, select
+
+from database import SessionLocal
+from services.notifications import notify_recipients
+import models
+
+
+def create_announcement(db, course, teacher_id, message):
+    announcement = models.Announcement(
+        course_id=course.course_id,
+        teacher_id=teacher_id,
+        message=f"[THÔNG BÁO LỚP {course.title}]: {message}",
+        status='pending',
+        created_at=datetime.datetime.utcnow()
+    )
+    db.add(announcement)
+    db.commit()
+    return announcement.announcement_id
+
+
+def fan_out(db, announcement):
+    now = datetime.datetime.utcnow()
+    student_ids = select(models.Payment.student_id).where(
+        models.Payment.course_id == announcement.course_id,
+        models.Payment.status == 'paid'
+    ).distinct()
+    rows = select(
+        student_ids.subquery().c.student_id,
+        literal(announcement.message),
+        literal(now),
+        false(),
+        literal(announcement.announcement_id)
+    )
+
+    result = db.execute(insert(models.Notification).from_select(
+        ["user_id", "message", "created_at", "is_read", "announcement_id"], rows
+    ))
+    notify_recipients(db, student_ids)
+    announcement.recipient_count = result.rowcount
+    announcement.status = 'delivered'
+    announcement.delivered_at = now
+    db.commit()
+    return result.rowcount
+
+
+def deliver_announcement(announcement_id: int):
+    db = SessionLocal()
+    try:
+        announcement = db.query(models.Announcement).get(announcement_id)
+        if announcement and announcement.status == 'pending':
+            count = fan_out(db, announcement)
+            print(f"[Background] Đã gửi thông báo #{announcement_id} tới {count} học sinh")
+    except Exception as e:
+        print(f"Lỗi khi gửi thông báo #{announcement_id}: {e}")
+        traceback.print_exc()
+        db.rollback()
+        db.query(models.Announcement).filter(
+            models.Announcement.announcement_id == announcement_id
+        ).update({"status": "failed"})
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,32 @@
+from services.cache import InvalidatingCache
+import config
+import models
+
+_answer_keys = InvalidatingCache(config.ANSWER_KEY_TTL, config.ANSWER_KEY_CACHE_SIZE,
+                                 lambda obj: isinstance(obj, (models.Quiz, models.Question)), keys=lambda obj: obj.quiz_id)
+
+
+def load_answer_key(db, quiz_id):
+    if not db.query(models.Quiz.quiz_id).filter(models.Quiz.quiz_id == quiz_id).first():
+        return None
+
+    return tuple(db.query(models.Question.question_id, models.Question.correct_answer).filter(
+        models.Question.quiz_id == quiz_id
+    ).order_by(models.Question.question_id).all())
+
+
+def get_answer_key(db, quiz_id):
+    return _answer_keys.get_or_build(quiz_id, lambda: load_answer_key(db, quiz_id))
+
+
+def score_answers(answer_key, form_data):
+    answers = []
+    correct_count = 0
+    for question_id, correct_answer in answer_key:
+        selected_option = form_data.get(f"q_{question_id}")
+        is_correct = bool(selected_option) and selected_option == correct_answer
+        correct_count += is_correct
+        answers.append({"question_id": question_id, "selected_option": selected_option, "is_correct": is_correct})
+
+    score = round((correct_count / len(answer_key)) * 10, 2) if answer_key else 0
+    return score, answers
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+ALL = object()
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds, max_size=1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class InvalidatingCache(TTLCache):
+    # drops entries after a commit that touched an object accepted by
+    # `matches`: the entry under keys(obj), or everything when keys is None
+    def __init__(self, ttl_seconds, max_size, matches, keys=None):
+        super().__init__(ttl_seconds, max_size)
+        self.matches = matches
+        self.keys = keys
+        self._generation = 0
+        self._build_lock = threading.Lock()
+        self._info_key = f"cache_changed_{id(self)}"
+        event.listen(Session, "after_flush", self._track_changes)
+        event.listen(Session, "after_commit", self._invalidate_on_commit)
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._build_lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            generation = self._generation
+            value = build()
+            if generation == self._generation:
+                self.set(key, value)
+            return value
+
+    def invalidate(self, key):
+        self._generation += 1
+        super().invalidate(key)
+
+    def clear(self):
+        self._generation += 1
+        super().clear()
+
+    def _track_changes(self, session, flush_context):
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if not self.matches(obj):
+                continue
+            if self.keys is None:
+                session.info[self._info_key] = ALL
+                return
+            session.info.setdefault(self._info_key, set()).add(self.keys(obj))
+
+    def _invalidate_on_commit(self, session):
+        changed = session.info.pop(self._info_key, None)
+        if changed is ALL:
+            self.clear()
+        elif changed:
+            for key in changed:
+                self.invalidate(key)
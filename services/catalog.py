@@ -0,0 +1,104 @@
+from sqlalchemy.orm import joinedload
+
+from services.cache import InvalidatingCache
+from services.text import fold_text, words
+import config
+import models
+
+
+class CatalogCourse:
+    __slots__ = ("course_id", "title", "description", "price", "status", "teacher_id", "teacher_name", "search_text")
+
+    def __init__(self, course):
+        self.course_id = course.course_id
+        self.title = course.title
+        self.description = course.description
+        self.price = course.price
+        self.status = course.status
+        self.teacher_id = course.teacher_id
+        self.teacher_name = course.teacher.user.fullname if course.teacher and course.teacher.user else None
+        self.search_text = fold_text(" ".join(filter(None, (self.title, self.description, self.teacher_name))))
+
+    def to_dict(self):
+        return {
+            "course_id": self.course_id,
+            "title": self.title,
+            "description": self.description,
+            "price": self.price,
+            "teacher_id": self.teacher_id,
+            "teacher_name": self.teacher_name,
+        }
+
+
+class Catalog:
+    def __init__(self, courses):
+        self.courses = tuple(courses)
+        self.by_id = {course.course_id: course for course in self.courses}
+
+    def search(self, q=None, min_price=None, max_price=None, teacher_id=None, owned=None, only_owned=None):
+        terms = words(q)
+        results = []
+        for course in self.courses:
+            if terms and not all(term in course.search_text for term in terms):
+                continue
+            if min_price is not None and (course.price or 0) < min_price:
+                continue
+            if max_price is not None and (course.price or 0) > max_price:
+                continue
+            if teacher_id is not None and course.teacher_id != teacher_id:
+                continue
+            if only_owned is not None and owned is not None and (course.course_id in owned) != only_owned:
+                continue
+            results.append(course)
+        return results
+
+
+def _affects_catalog(obj):
+    return isinstance(obj, (models.Course, models.Teacher)) or (isinstance(obj, models.User) and obj.role == 'teacher')
+
+
+_catalog = InvalidatingCache(config.CATALOG_TTL, 1, _affects_catalog)
+_owned = InvalidatingCache(config.OWNED_COURSES_TTL, config.OWNED_COURSES_CACHE_SIZE,
+                           lambda obj: isinstance(obj, models.Payment), keys=lambda payment: payment.student_id)
+
+
+def build_catalog(db):
+    courses = db.query(models.Course).options(
+        joinedload(models.Course.teacher).joinedload(models.Teacher.user)
+    ).filter(models.Course.status == 'active').order_by(models.Course.course_id).all()
+    return Catalog(CatalogCourse(course) for course in courses)
+
+
+def get_catalog(db):
+    return _catalog.get_or_build("all", lambda: build_catalog(db))
+
+
+def invalidate_catalog():
+    _catalog.clear()
+
+
+def owned_course_ids(db, student_id):
+    owned = _owned.get(student_id)
+    if owned is not None:
+        return owned
+
+    owned = frozenset(row[0] for row in db.query(models.Payment.course_id).filter(
+        models.Payment.student_id == student_id,
+        models.Payment.status == 'paid'
+    ))
+    _owned.set(student_id, owned)
+    return owned
+
+
+def owns_course(db, student_id, course_id):
+    owned = owned_course_ids(db, student_id)
+    if course_id in owned:
+        return True
+    paid = db.query(models.Payment.payment_id).filter(
+        models.Payment.student_id == student_id,
+        models.Payment.course_id == course_id,
+        models.Payment.status == 'paid'
+    ).first() is not None
+    if paid:
+        _owned.set(student_id, owned | {course_id})
+    return paid
@@ -0,0 +1,103 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from itertools import chain
+
+from markupsafe import Markup
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, selectinload
+
+from services.cache import TTLCache
+from templating import env
+import config
+import models
+
+CONTENT_MODELS = (models.Lesson, models.Quiz, models.Assignment)
+PAGE_TEMPLATES = ("base.html", "student_learn.html", "_learn_content.html")
+EPOCH = datetime.datetime(1970, 1, 1)
+
+_fragments = TTLCache(config.COURSE_CONTENT_TTL, config.COURSE_CONTENT_CACHE_SIZE)
+_template_digest = None
+
+
+def content_version(db, course_id):
+    row = db.query(models.Course.updated_at).filter(models.Course.course_id == course_id).first()
+    if row is None:
+        return None
+    return row.updated_at or EPOCH
+
+
+def render_content(db, course_id, version):
+    key = (course_id, version)
+    html = _fragments.get(key)
+    if html is None:
+        course = db.query(models.Course).options(
+            selectinload(models.Course.lessons),
+            selectinload(models.Course.quizzes),
+            selectinload(models.Course.assignments)
+        ).filter(models.Course.course_id == course_id).first()
+        html = Markup(env.get_template("_learn_content.html").render(course=course))
+        _fragments.set(key, html)
+    return html
+
+
+def invalidate_content():
+    _fragments.clear()
+
+
+def _templates_digest():
+    global _template_digest
+    if _template_digest is None:
+        sources = "".join(env.loader.get_source(env, name)[0] for name in PAGE_TEMPLATES)
+        _template_digest = hashlib.sha1(sources.encode()).hexdigest()
+    return _template_digest
+
+
+def validators(course_id, version, user):
+    viewer = hashlib.sha1(f"{_templates_digest()}:{user.user_id}:{user.role}:{user.fullname}".encode()).hexdigest()[:16]
+    stamp = int((version - EPOCH).total_seconds() * 1000000)
+    return {
+        "ETag": f'W/"{course_id}-{stamp}-{viewer}"',
+        "Last-Modified": format_datetime(version.replace(tzinfo=datetime.timezone.utc), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def _opaque(tag):
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request, headers, version):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = _opaque(headers["ETag"])
+        return any(tag.strip() == "*" or _opaque(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return since >= version.replace(microsecond=0, tzinfo=datetime.timezone.utc)
+    return False
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_changed_courses(session, flush_context, instances):
+    now = datetime.datetime.utcnow()
+    course_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, CONTENT_MODELS) and obj.course_id is not None:
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            course_ids.add(obj.course_id)
+        elif isinstance(obj, models.Course) and obj in session.dirty and session.is_modified(obj, include_collections=False):
+            obj.updated_at = now
+    if course_ids:
+        session.execute(
+            update(models.Course.__table__).where(models.Course.course_id.in_(course_ids)).values(updated_at=now)
+        )
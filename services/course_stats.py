@@ -0,0 +1,95 @@
+from sqlalchemy import func, select
+
+from services.cache import InvalidatingCache
+import config
+import models
+
+GOOD_ENROLLMENT = 5
+
+
+class CourseStats:
+    __slots__ = ("course_id", "title", "price", "status", "teacher_id", "teacher_name",
+                 "student_count", "revenue", "lesson_count", "quiz_count")
+
+    def __init__(self, course_id, title, price, status, teacher_id, teacher_name,
+                 student_count, revenue, lesson_count, quiz_count):
+        self.course_id = course_id
+        self.title = title
+        self.price = price
+        self.status = status
+        self.teacher_id = teacher_id
+        self.teacher_name = teacher_name
+        self.student_count = student_count
+        self.revenue = revenue
+        self.lesson_count = lesson_count
+        self.quiz_count = quiz_count
+
+    @property
+    def quality(self):
+        return "Tốt" if self.student_count >= GOOD_ENROLLMENT else "Cần cải thiện"
+
+
+class CourseOverview:
+    def __init__(self, courses):
+        self.courses = tuple(courses)
+        self.by_id = {course.course_id: course for course in self.courses}
+        self.totals = {
+            "total_courses": len(self.courses),
+            "total_lessons": sum(course.lesson_count for course in self.courses),
+            "total_quizzes": sum(course.quiz_count for course in self.courses),
+            "total_students": sum(course.student_count for course in self.courses),
+            "total_revenue": sum(course.revenue for course in self.courses),
+        }
+
+
+def _count_by_course(column, *criteria):
+    return (
+        select(column.label("course_id"), func.count().label("n"))
+        .where(*criteria)
+        .group_by(column)
+        .subquery()
+    )
+
+
+def overview_query():
+    payments = (
+        select(
+            models.Payment.course_id.label("course_id"),
+            func.count(func.distinct(models.Payment.student_id)).label("students"),
+            func.sum(models.Payment.amount).label("revenue"),
+        )
+        .where(models.Payment.status == 'paid')
+        .group_by(models.Payment.course_id)
+        .subquery()
+    )
+    lessons = _count_by_course(models.Lesson.course_id)
+    quizzes = _count_by_course(models.Quiz.course_id)
+    course = models.Course
+    return (
+        select(
+            course.course_id, course.title, course.price, course.status, course.teacher_id,
+            models.User.fullname,
+            func.coalesce(payments.c.students, 0),
+            func.coalesce(payments.c.revenue, 0),
+            func.coalesce(lessons.c.n, 0),
+            func.coalesce(quizzes.c.n, 0),
+        )
+        .outerjoin(models.User, models.User.user_id == course.teacher_id)
+        .outerjoin(payments, payments.c.course_id == course.course_id)
+        .outerjoin(lessons, lessons.c.course_id == course.course_id)
+        .outerjoin(quizzes, quizzes.c.course_id == course.course_id)
+        .order_by(course.course_id)
+    )
+
+
+def _affects_overview(obj):
+    return isinstance(obj, (models.Course, models.Payment, models.Lesson, models.Quiz, models.Teacher)) or (
+        isinstance(obj, models.User) and obj.role == 'teacher'
+    )
+
+
+_overviews = InvalidatingCache(config.COURSE_STATS_TTL, 1, _affects_overview)
+
+
+def get_overview(db):
+    return _overviews.get_or_build("all", lambda: CourseOverview(CourseStats(*row) for row in db.execute(overview_query())))
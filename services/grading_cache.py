@@ -0,0 +1,113 @@
+import datetime
+import hashlib
+import re
+import threading
+import unicodedata
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.exc import IntegrityError
+
+import config
+import models
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def hit(self, saved_seconds):
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += saved_seconds or 0
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+            self.saved_seconds = 0.0
+
+
+stats = CacheStats()
+_stores = 0
+
+
+def normalize_answer(answer):
+    text = unicodedata.normalize("NFC", answer or "")
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def answer_hash(answer):
+    return hashlib.sha256(normalize_answer(answer).encode("utf-8")).hexdigest()
+
+
+def lookup(db, assignment_id, answer):
+    if not config.GRADING_CACHE_ENABLED:
+        return None
+    digest = answer_hash(answer)
+    entry = db.query(models.GradingCache).get((assignment_id, digest))
+    if entry is None:
+        stats.miss()
+        return None
+
+    db.execute(
+        update(models.GradingCache)
+        .where(models.GradingCache.assignment_id == assignment_id, models.GradingCache.answer_hash == digest)
+        .values(hit_count=models.GradingCache.hit_count + 1, last_used_at=datetime.datetime.utcnow())
+    )
+    stats.hit(entry.grade_seconds)
+    return {"score": entry.score, "feedback": entry.feedback}
+
+
+def store(db, assignment_id, answer, result, grade_seconds=0):
+    global _stores
+    if not config.GRADING_CACHE_ENABLED:
+        return
+    try:
+        with db.begin_nested():
+            db.add(models.GradingCache(
+                assignment_id=assignment_id, answer_hash=answer_hash(answer),
+                score=result["score"], feedback=result["feedback"], grade_seconds=grade_seconds
+            ))
+    except IntegrityError:
+        return
+
+    _stores += 1
+    if _stores % config.GRADING_CACHE_EVICT_EVERY == 0:
+        evict(db)
+
+
+def evict(db, max_entries=None):
+    max_entries = max_entries or config.GRADING_CACHE_SIZE
+    cutoff = db.query(models.GradingCache.last_used_at).order_by(
+        models.GradingCache.last_used_at.desc()
+    ).offset(max_entries).limit(1).scalar()
+    if cutoff is None:
+        return 0
+    return db.execute(
+        delete(models.GradingCache).where(models.GradingCache.last_used_at <= cutoff)
+    ).rowcount
+
+
+def invalidate_assignment(db, assignment_id):
+    db.query(models.GradingCache).filter(models.GradingCache.assignment_id == assignment_id).delete(synchronize_session=False)
+
+
+def summary(db):
+    entries, hits, saved = db.query(
+        func.count(),
+        func.coalesce(func.sum(models.GradingCache.hit_count), 0),
+        func.coalesce(func.sum(models.GradingCache.hit_count * models.GradingCache.grade_seconds), 0),
+    ).select_from(models.GradingCache).one()
+    return {"entries": entries, "hits": hits, "saved_seconds": float(saved)}
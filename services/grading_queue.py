@@ -0,0 +1,237 @@
+import asyncio
+import datetime
+import inspect
+import os
+import socket
+import time
+import traceback
+
+from sqlalchemy import update
+
+from database import SessionLocal
+from services import grading_cache, grading_status, progress
+import config
+import models
+
+def enqueue(db, submission_id):
+    now = datetime.datetime.utcnow()
+    job = db.query(models.GradingJob).filter(models.GradingJob.submission_id == submission_id).first()
+    if job is None:
+        job = models.GradingJob(submission_id=submission_id, created_at=now)
+        db.add(job)
+    job.status = 'queued'
+    job.attempts = 0
+    job.max_attempts = config.GRADING_MAX_ATTEMPTS
+    job.next_run_at = now
+    job.locked_by = None
+    job.last_error = None
+    job.updated_at = now
+    return job
+
+
+def submit_for_grading(db, submission):
+    job = enqueue(db, submission.submission_id)
+    cached = grading_cache.lookup(db, submission.assignment_id, submission.answer)
+    if cached:
+        apply_result(db, submission, cached)
+        job.status = 'done'
+    return job
+
+
+def claim(db, worker_id, limit):
+    now = datetime.datetime.utcnow()
+    candidates = [row[0] for row in db.query(models.GradingJob.job_id).filter(
+        models.GradingJob.status == 'queued',
+        models.GradingJob.next_run_at <= now
+    ).order_by(models.GradingJob.next_run_at).limit(limit).all()]
+
+    claimed = []
+    for job_id in candidates:
+        won = db.execute(
+            update(models.GradingJob)
+            .where(models.GradingJob.job_id == job_id, models.GradingJob.status == 'queued')
+            .values(status='running', locked_by=worker_id, attempts=models.GradingJob.attempts + 1, updated_at=now)
+        ).rowcount
+        if won:
+            claimed.append(job_id)
+    db.commit()
+    return claimed
+
+
+def retry_delay(attempts):
+    return min(config.GRADING_RETRY_MAX_SECONDS, config.GRADING_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def mark_failed(db, job, error):
+    now = datetime.datetime.utcnow()
+    job.last_error = str(error)[:2000]
+    job.locked_by = None
+    job.updated_at = now
+    if job.attempts >= job.max_attempts:
+        job.status = 'failed'
+    else:
+        job.status = 'queued'
+        job.next_run_at = now + datetime.timedelta(seconds=retry_delay(job.attempts))
+    db.commit()
+
+
+def apply_result(db, submission, result):
+    if submission.grading_status == grading_status.GRADED:
+        return
+    previous_score = submission.teacher_score
+    submission.ai_score = result['score']
+    submission.teacher_score = result['score']
+    submission.teacher_feedback = result['feedback']
+    submission.grading_status = grading_status.AI_GRADED
+    progress.record_assignment_grade(db, submission, previous_score)
+
+
+def is_owned(job, worker_id):
+    return job.status == 'running' and job.locked_by == worker_id
+
+
+def save_result(db, job, submission, result, worker_id):
+    done = db.execute(
+        update(models.GradingJob)
+        .where(models.GradingJob.job_id == job.job_id, models.GradingJob.status == 'running',
+               models.GradingJob.locked_by == worker_id)
+        .values(status='done', locked_by=None, last_error=None, updated_at=datetime.datetime.utcnow())
+    ).rowcount
+    if not done:
+        db.rollback()
+        return False
+    apply_result(db, submission, result)
+    db.commit()
+    return True
+
+
+def requeue_stale(db):
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=config.GRADING_STALE_SECONDS)
+    return db.execute(
+        update(models.GradingJob)
+        .where(models.GradingJob.status == 'running', models.GradingJob.updated_at < cutoff)
+        .values(status='queued', locked_by=None, next_run_at=datetime.datetime.utcnow())
+    ).rowcount
+
+
+def load_task(db, job_id):
+    job = db.query(models.GradingJob).get(job_id)
+    submission = job.submission if job else None
+    if not submission:
+        return job, None, None, None
+    assignment = submission.assignment
+    question = (assignment.content or assignment.title) if assignment else 'Không có đề bài'
+    return job, submission, question, submission.answer
+
+
+def start_job(job_id, worker_id):
+    db = SessionLocal()
+    try:
+        job, submission, question, answer = load_task(db, job_id)
+        if job is None or not is_owned(job, worker_id):
+            return None, None
+        if not submission:
+            if job:
+                job.attempts = job.max_attempts
+                mark_failed(db, job, "Không tìm thấy bài nộp")
+            return None, False
+
+        cached = grading_cache.lookup(db, submission.assignment_id, answer)
+        if cached:
+            return None, save_result(db, job, submission, cached, worker_id) or None
+        return {"assignment_id": submission.assignment_id, "question": question, "answer": answer}, None
+    except Exception as e:
+        print(f"Lỗi Database khi chấm job #{job_id}: {e}")
+        traceback.print_exc()
+        db.rollback()
+        return None, False
+    finally:
+        db.close()
+
+
+def finish_job(job_id, worker_id, task, result=None, error=None, grade_seconds=0):
+    db = SessionLocal()
+    try:
+        job = db.query(models.GradingJob).get(job_id)
+        submission = job.submission if job else None
+        if not submission or not is_owned(job, worker_id) or submission.answer != task["answer"]:
+            print(f"[Grading] Bỏ qua kết quả cũ của job #{job_id}")
+            return None
+        if error is not None:
+            print(f"[Grading] Lỗi khi chấm bài #{job.submission_id} (lần {job.attempts}): {error}")
+            mark_failed(db, job, error)
+            return False
+        grading_cache.store(db, task["assignment_id"], task["answer"], result, grade_seconds)
+        if not save_result(db, job, submission, result, worker_id):
+            print(f"[Grading] Bỏ qua kết quả cũ của job #{job_id}")
+            return None
+        print(f"[Grading] Đã lưu điểm bài #{job.submission_id}: {result['score']}")
+        return True
+    except Exception as e:
+        print(f"Lỗi Database khi chấm job #{job_id}: {e}")
+        traceback.print_exc()
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+async def call_grader(grader, question, answer):
+    if inspect.iscoroutinefunction(grader):
+        return await grader(question, answer)
+    return await asyncio.to_thread(grader, question, answer)
+
+
+class GradingWorker:
+    def __init__(self, concurrency=None, grader=None, poll_seconds=None, worker_id=None):
+        self.concurrency = concurrency or config.GRADING_CONCURRENCY
+        if grader is None:
+            from services.ai_grader import get_grader
+
+            grader = get_grader()
+        self.grader = grader
+        self.poll_seconds = poll_seconds if poll_seconds is not None else config.GRADING_POLL_SECONDS
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.processed = 0
+        self.failed = 0
+        self._running = set()
+
+    def _claim(self, limit):
+        db = SessionLocal()
+        try:
+            requeue_stale(db)
+            return claim(db, self.worker_id, limit)
+        finally:
+            db.close()
+
+    async def _run_job(self, job_id):
+        task, ok = await asyncio.to_thread(start_job, job_id, self.worker_id)
+        if task is not None:
+            result, error = None, None
+            started = time.perf_counter()
+            try:
+                result = await call_grader(self.grader, task["question"], task["answer"])
+            except Exception as e:
+                error = e
+            ok = await asyncio.to_thread(finish_job, job_id, self.worker_id, task, result, error, time.perf_counter() - started)
+        if ok:
+            self.processed += 1
+        elif ok is False:
+            self.failed += 1
+
+    async def run(self, stop_when_idle=False):
+        while True:
+            self._running = {t for t in self._running if not t.done()}
+            free = self.concurrency - len(self._running)
+            job_ids = await asyncio.to_thread(self._claim, free) if free > 0 else []
+
+            for job_id in job_ids:
+                self._running.add(asyncio.create_task(self._run_job(job_id)))
+
+            if not job_ids:
+                if stop_when_idle and not self._running:
+                    return
+                if self._running:
+                    await asyncio.wait(self._running, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(self.poll_seconds)
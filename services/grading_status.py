@@ -0,0 +1,35 @@
+from sqlalchemy import case, func, update
+
+import models
+
+PENDING = 'pending'
+AI_GRADED = 'ai_graded'
+GRADED = 'graded'
+STATUSES = (PENDING, AI_GRADED, GRADED)
+
+S = models.Submission
+
+
+def teacher_submissions(db, teacher_id, status=None):
+    query = db.query(S).join(
+        models.Assignment, models.Assignment.assignment_id == S.assignment_id
+    ).join(
+        models.Course, models.Course.course_id == models.Assignment.course_id
+    ).filter(models.Course.teacher_id == teacher_id)
+    if status is not None:
+        query = query.filter(S.grading_status == status)
+    return query
+
+
+def pending_count(db, teacher_id):
+    return teacher_submissions(db, teacher_id, PENDING).with_entities(func.count(S.submission_id)).scalar()
+
+
+def rebuild(db):
+    result = db.execute(update(S).values(grading_status=case(
+        (S.teacher_score.is_(None), PENDING),
+        (S.graded_by == "Teacher", GRADED),
+        else_=AI_GRADED,
+    )))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,63 @@
+import gzip
+
+from fastapi.responses import Response
+from sqlalchemy.orm import undefer
+
+from services.course_content import EPOCH, not_modified
+import config
+import models
+
+L = models.Lesson
+
+
+def set_content(lesson, html):
+    data = (html or "").encode("utf-8")
+    lesson.content_size = len(data)
+    if config.LESSON_GZIP and len(data) >= config.LESSON_GZIP_MIN_BYTES:
+        lesson.content = None
+        lesson.content_gzip = gzip.compress(data)
+    else:
+        lesson.content = html
+        lesson.content_gzip = None
+
+
+def lesson_version(db, lesson_id):
+    return db.query(L.lesson_id, L.course_id, models.Course.teacher_id, models.Course.updated_at).join(
+        models.Course, models.Course.course_id == L.course_id
+    ).filter(L.lesson_id == lesson_id).first()
+
+
+def body_response(db, request, lesson):
+    version = lesson.updated_at or EPOCH
+    headers = {
+        "ETag": f'W/"lesson-{lesson.lesson_id}-{int((version - EPOCH).total_seconds() * 1000000)}"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if not_modified(request, headers, version):
+        return Response(status_code=304, headers=headers)
+
+    content, compressed = db.query(L.content, L.content_gzip).filter(L.lesson_id == lesson.lesson_id).one()
+    if compressed is not None:
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(compressed, media_type="text/html", headers={**headers, "Content-Encoding": "gzip"})
+        content = gzip.decompress(compressed).decode("utf-8")
+    return Response(content or "", media_type="text/html", headers=headers)
+
+
+def rebuild(db, batch_size=200):
+    last_id = 0
+    count = 0
+    while True:
+        lessons = db.query(L).options(undefer(L.content), undefer(L.content_gzip)).filter(L.lesson_id > last_id).order_by(L.lesson_id).limit(batch_size).all()
+        if not lessons:
+            break
+        for lesson in lessons:
+            html = lesson.content
+            if lesson.content_gzip is not None:
+                html = gzip.decompress(lesson.content_gzip).decode("utf-8")
+            set_content(lesson, html)
+        last_id = lessons[-1].lesson_id
+        count += len(lessons)
+        db.commit()
+    return count
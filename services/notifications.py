@@ -0,0 +1,58 @@
+import datetime
+
+from sqlalchemy import case, func, select, update
+
+import models
+
+
+def _bump_unread(db, user_filter, amount=1):
+    db.execute(
+        update(models.User)
+        .where(user_filter)
+        .values(unread_notifications=func.coalesce(models.User.unread_notifications, 0) + amount)
+    )
+
+
+def notify(db, user_id, message):
+    notification = models.Notification(
+        user_id=user_id,
+        message=message,
+        is_read=False,
+        created_at=datetime.datetime.utcnow()
+    )
+    db.add(notification)
+    _bump_unread(db, models.User.user_id == user_id)
+    return notification
+
+
+def notify_recipients(db, recipient_ids):
+    # recipient_ids: a SELECT of user ids that just received one notification each
+    _bump_unread(db, models.User.user_id.in_(recipient_ids))
+
+
+def mark_all_read(db, user_id):
+    changed = db.execute(
+        update(models.Notification)
+        .where(models.Notification.user_id == user_id, models.Notification.is_read == False)
+        .values(is_read=True)
+    ).rowcount
+    if changed:
+        unread = func.coalesce(models.User.unread_notifications, 0)
+        db.execute(update(models.User).where(models.User.user_id == user_id).values(
+            unread_notifications=case((unread > changed, unread - changed), else_=0)
+        ))
+    db.commit()
+    return changed
+
+
+def unread_count(db, user_id):
+    return db.query(models.User.unread_notifications).filter(models.User.user_id == user_id).scalar() or 0
+
+
+def rebuild_unread_counters(db):
+    unread = select(func.count(models.Notification.notification_id)).where(
+        models.Notification.user_id == models.User.user_id,
+        models.Notification.is_read == False
+    ).scalar_subquery()
+    db.execute(update(models.User).values(unread_notifications=unread))
+    db.commit()
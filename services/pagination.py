@@ -0,0 +1,88 @@
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+import config
+
+
+class Page:
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def clamp_page_size(limit):
+    if not limit or limit < 1:
+        return config.PAGE_SIZE
+    return min(limit, config.MAX_PAGE_SIZE)
+
+
+def _dump(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and value.keys() == {"dt"}:
+        return datetime.datetime.fromisoformat(value["dt"])
+    if isinstance(value, (str, int, float)):
+        return value
+    raise ValueError("cursor values must be non-null scalars")
+
+
+def encode_cursor(values):
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor, size=None):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        return None
+    try:
+        return [_load(v) for v in values]
+    except (ValueError, TypeError):
+        return None
+
+
+def _after(columns, values, descending):
+    # (a, b) < (x, y)  ==  a < x OR (a = x AND b < y)
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns, cursor=None, limit=None, descending=True):
+    # columns[-1] must be unique; the cursor is the sort key of the previous page's last row
+    limit = clamp_page_size(limit)
+    values = decode_cursor(cursor, len(columns))
+    if values is not None:
+        query = query.filter(_after(columns, values, descending))
+
+    order = [c.desc() for c in columns] if descending else [c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return Page(rows, next_cursor)
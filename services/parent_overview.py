@@ -0,0 +1,80 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager, joinedload
+
+from services import progress
+import models
+
+RECENT_LIMIT = 10
+
+
+class ChildOverview:
+    __slots__ = ("child", "courses", "quiz_results", "assignments")
+
+    def __init__(self, child, courses, quiz_results, assignments):
+        self.child = child
+        self.courses = courses
+        self.quiz_results = quiz_results
+        self.assignments = assignments
+
+    @property
+    def average_quiz_score(self):
+        if not self.quiz_results:
+            return None
+        return round(sum(sub.score or 0 for sub in self.quiz_results) / len(self.quiz_results), 1)
+
+
+def _latest(db, model, related, student_ids, limit):
+    rank = func.row_number().over(
+        partition_by=model.student_id,
+        order_by=(model.submitted_at.desc(), model.submission_id.desc())
+    ).label("rank")
+    ranked = select(model.submission_id, rank).where(model.student_id.in_(student_ids)).subquery()
+
+    rows = db.query(model).join(
+        ranked, ranked.c.submission_id == model.submission_id
+    ).outerjoin(related).options(contains_eager(related)).filter(
+        ranked.c.rank <= limit
+    ).order_by(model.student_id, ranked.c.rank).all()
+
+    latest = {}
+    for row in rows:
+        latest.setdefault(row.student_id, []).append(row)
+    return latest
+
+
+def recent_quiz_results(db, student_ids, limit=RECENT_LIMIT):
+    return _latest(db, models.QuizSubmission, models.QuizSubmission.quiz, student_ids, limit)
+
+
+def recent_submissions(db, student_ids, limit=RECENT_LIMIT):
+    return _latest(db, models.Submission, models.Submission.assignment, student_ids, limit)
+
+
+def children_of(db, parent_id, student_id=None):
+    link = models.parent_student_association
+    query = db.query(models.Student).join(link, link.c.student_id == models.Student.student_id).options(
+        joinedload(models.Student.user)
+    ).filter(link.c.parent_id == parent_id)
+    if student_id is not None:
+        query = query.filter(models.Student.student_id == student_id)
+    return query.order_by(models.Student.student_id).all()
+
+
+def family_overview(db, parent_id, student_id=None, limit=RECENT_LIMIT):
+    children = children_of(db, parent_id, student_id)
+    if not children:
+        return []
+
+    student_ids = [child.student_id for child in children]
+    courses = progress.courses_with_progress_for(db, student_ids, with_teacher=True)
+    quiz_results = recent_quiz_results(db, student_ids, limit)
+    assignments = recent_submissions(db, student_ids, limit)
+    return [
+        ChildOverview(
+            child,
+            courses.get(child.student_id, []),
+            quiz_results.get(child.student_id, []),
+            assignments.get(child.student_id, []),
+        )
+        for child in children
+    ]
@@ -0,0 +1,167 @@
+import datetime
+
+from sqlalchemy import DateTime, Float, Integer, and_, case, cast, delete, func, insert, literal_column, null, or_, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from services.cache import TTLCache
+import config
+import models
+
+P = models.StudentProgress
+
+_quiz_courses = TTLCache(config.QUIZ_COURSE_TTL, config.QUIZ_COURSE_CACHE_SIZE)
+
+
+def _upsert(db, student_id, course_id, updates, initial):
+    now = datetime.datetime.utcnow()
+    where = and_(P.student_id == student_id, P.course_id == course_id)
+    if db.execute(update(P).where(where).values(last_activity_at=now, **updates)).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(P(student_id=student_id, course_id=course_id, last_activity_at=now, **initial))
+    except IntegrityError:
+        db.execute(update(P).where(where).values(last_activity_at=now, **updates))
+
+
+def quiz_course_id(db, quiz_id):
+    course_id = _quiz_courses.get(quiz_id)
+    if course_id is None:
+        course_id = db.query(models.Quiz.course_id).filter(models.Quiz.quiz_id == quiz_id).scalar()
+        _quiz_courses.set(quiz_id, course_id)
+    return course_id
+
+
+def record_lesson_view(db, student_id, lesson):
+    try:
+        with db.begin_nested():
+            db.add(models.LessonView(student_id=student_id, lesson_id=lesson.lesson_id, viewed_at=datetime.datetime.utcnow()))
+    except IntegrityError:
+        return False
+    _upsert(db, student_id, lesson.course_id, {"lessons_viewed": P.lessons_viewed + 1}, {"lessons_viewed": 1})
+    return True
+
+
+def forget_lesson(db, lesson):
+    viewers = select(models.LessonView.student_id).where(models.LessonView.lesson_id == lesson.lesson_id)
+    db.execute(update(P).where(P.course_id == lesson.course_id, P.student_id.in_(viewers)).values(
+        lessons_viewed=case((P.lessons_viewed > 0, P.lessons_viewed - 1), else_=0)
+    ), execution_options={"synchronize_session": False})
+    db.execute(delete(models.LessonView).where(models.LessonView.lesson_id == lesson.lesson_id),
+               execution_options={"synchronize_session": False})
+
+
+def record_quiz_attempt(db, student_id, course_id, score, first_attempt):
+    _upsert(db, student_id, course_id, {
+        "quiz_attempts": P.quiz_attempts + 1,
+        "quizzes_attempted": P.quizzes_attempted + int(first_attempt),
+        "best_quiz_score": case((or_(P.best_quiz_score.is_(None), P.best_quiz_score < score), score), else_=P.best_quiz_score),
+        "latest_quiz_score": score,
+    }, {
+        "quiz_attempts": 1, "quizzes_attempted": 1, "best_quiz_score": score, "latest_quiz_score": score,
+    })
+
+
+def record_assignment_submission(db, student_id, course_id, first_submission, previous_score):
+    was_graded = previous_score is not None
+    _upsert(db, student_id, course_id, {
+        "assignments_submitted": P.assignments_submitted + int(first_submission),
+        "assignments_graded": P.assignments_graded - int(was_graded),
+        "assignment_score_total": P.assignment_score_total - (previous_score or 0),
+    }, {
+        "assignments_submitted": 1,
+    })
+
+
+def record_assignment_grade(db, submission, previous_score):
+    score = submission.teacher_score
+    _upsert(db, submission.student_id, submission.assignment.course_id, {
+        "assignments_graded": P.assignments_graded + (int(score is not None) - int(previous_score is not None)),
+        "assignment_score_total": P.assignment_score_total + ((score or 0) - (previous_score or 0)),
+    }, {
+        "assignments_graded": int(score is not None), "assignment_score_total": score or 0,
+    })
+
+
+def courses_with_progress(db, student_id, with_teacher=False):
+    return courses_with_progress_for(db, [student_id], with_teacher).get(student_id, [])
+
+
+def courses_with_progress_for(db, student_ids, with_teacher=False):
+    lesson_count = select(func.count(models.Lesson.lesson_id)).where(
+        models.Lesson.course_id == models.Course.course_id
+    ).correlate(models.Course).scalar_subquery().label("lesson_count")
+
+    query = db.query(models.Payment.student_id, models.Course, P, lesson_count)
+    if with_teacher:
+        query = query.options(joinedload(models.Course.teacher).joinedload(models.Teacher.user))
+    rows = query.select_from(models.Payment).join(
+        models.Course, models.Course.course_id == models.Payment.course_id
+    ).outerjoin(
+        P, and_(P.course_id == models.Course.course_id, P.student_id == models.Payment.student_id)
+    ).filter(
+        models.Payment.student_id.in_(student_ids),
+        models.Payment.status == 'paid'
+    ).order_by(models.Payment.student_id, models.Course.course_id).all()
+
+    courses = {}
+    for student_id, course, course_progress, count in rows:
+        courses.setdefault(student_id, []).append((course, course_progress, count))
+    return courses
+
+
+def rebuild(db):
+    Q, S = models.QuizSubmission, models.Submission
+    no_int, no_float, no_time = cast(null(), Integer), cast(null(), Float), cast(null(), DateTime)
+    one, zero = literal_column("1"), literal_column("0")
+
+    # one row per enrollment, lesson view, quiz attempt and assignment submission
+    events = union_all(
+        select(models.Payment.student_id.label("student_id"), models.Payment.course_id.label("course_id"),
+               no_time.label("at"), zero.label("viewed"), no_int.label("quiz_id"), no_float.label("quiz_score"),
+               zero.label("submitted"), no_float.label("assignment_score"))
+        .where(models.Payment.status == 'paid'),
+        select(models.LessonView.student_id, models.Lesson.course_id, models.LessonView.viewed_at,
+               one, no_int, no_float, zero, no_float)
+        .join(models.Lesson, models.Lesson.lesson_id == models.LessonView.lesson_id),
+        select(Q.student_id, models.Quiz.course_id, Q.submitted_at, zero, Q.quiz_id, Q.score, zero, no_float)
+        .join(models.Quiz, models.Quiz.quiz_id == Q.quiz_id),
+        select(S.student_id, models.Assignment.course_id, S.submitted_at, zero, no_int, no_float, one, S.teacher_score)
+        .join(models.Assignment, models.Assignment.assignment_id == S.assignment_id),
+    ).subquery()
+
+    totals = select(
+        events.c.student_id, events.c.course_id,
+        func.sum(events.c.viewed).label("lessons_viewed"),
+        func.count(func.distinct(events.c.quiz_id)).label("quizzes_attempted"),
+        func.count(events.c.quiz_id).label("quiz_attempts"),
+        func.max(events.c.quiz_score).label("best_quiz_score"),
+        func.sum(events.c.submitted).label("assignments_submitted"),
+        func.count(events.c.assignment_score).label("assignments_graded"),
+        func.coalesce(func.sum(events.c.assignment_score), 0).label("assignment_score_total"),
+        func.max(events.c.at).label("last_activity_at"),
+    ).group_by(events.c.student_id, events.c.course_id).subquery()
+
+    ranked = select(
+        Q.student_id, models.Quiz.course_id, Q.score,
+        func.row_number().over(
+            partition_by=(Q.student_id, models.Quiz.course_id),
+            order_by=(Q.submitted_at.desc(), Q.submission_id.desc())
+        ).label("position")
+    ).join(models.Quiz, models.Quiz.quiz_id == Q.quiz_id).where(Q.score.isnot(None)).subquery()
+    latest = select(ranked.c.student_id, ranked.c.course_id, ranked.c.score).where(ranked.c.position == 1).subquery()
+
+    rows = select(
+        totals.c.student_id, totals.c.course_id, totals.c.lessons_viewed, totals.c.quizzes_attempted,
+        totals.c.quiz_attempts, totals.c.best_quiz_score, latest.c.score, totals.c.assignments_submitted,
+        totals.c.assignments_graded, totals.c.assignment_score_total, totals.c.last_activity_at,
+    ).outerjoin(latest, and_(latest.c.student_id == totals.c.student_id, latest.c.course_id == totals.c.course_id))
+
+    db.execute(delete(P))
+    db.execute(insert(P).from_select([
+        "student_id", "course_id", "lessons_viewed", "quizzes_attempted", "quiz_attempts", "best_quiz_score",
+        "latest_quiz_score", "assignments_submitted", "assignments_graded", "assignment_score_total", "last_activity_at",
+    ], rows))
+    db.commit()
+    return db.query(P).count()
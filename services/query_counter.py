@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from database import engine
+
+
+class QueryCounter:
+    def __init__(self, bind=None):
+        self.bind = bind or engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.bind, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.bind, "before_cursor_execute", self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def assert_max_queries(max_count, label="", bind=None):
+    with QueryCounter(bind) as counter:
+        yield counter
+    if counter.count > max_count:
+        listing = "\n".join(f"  {i}. {' '.join(s.split())[:200]}" for i, s in enumerate(counter.statements, 1))
+        raise AssertionError(f"{label or 'block'} ran {counter.count} SQL statements (max {max_count}):\n{listing}")
@@ -0,0 +1,100 @@
+import datetime
+
+from sqlalchemy import Date, cast, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+import models
+
+
+def _day_of(db, column):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def _increment(db, day, course_id, amount):
+    rollup = models.RevenueDaily
+    return db.execute(
+        update(rollup)
+        .where(rollup.day == day, rollup.course_id == course_id)
+        .values(total_amount=rollup.total_amount + amount, payment_count=rollup.payment_count + 1)
+    ).rowcount
+
+
+def record_payment(db, payment, teacher_id=None):
+    if payment.status != 'paid':
+        return
+    day = (payment.payment_date or datetime.datetime.utcnow()).date()
+    amount = payment.amount or 0
+
+    if _increment(db, day, payment.course_id, amount):
+        return
+    try:
+        with db.begin_nested():
+            db.add(models.RevenueDaily(
+                day=day, course_id=payment.course_id, teacher_id=teacher_id,
+                total_amount=amount, payment_count=1
+            ))
+    except IntegrityError:
+        _increment(db, day, payment.course_id, amount)
+
+
+def rebuild(db):
+    day = _day_of(db, models.Payment.payment_date)
+    rows = (
+        select(
+            day,
+            models.Payment.course_id,
+            models.Course.teacher_id,
+            func.sum(models.Payment.amount),
+            func.count(models.Payment.payment_id),
+        )
+        .join(models.Course, models.Course.course_id == models.Payment.course_id)
+        .where(models.Payment.status == 'paid')
+        .group_by(day, models.Payment.course_id, models.Course.teacher_id)
+    )
+
+    db.query(models.RevenueDaily).delete()
+    db.execute(insert(models.RevenueDaily).from_select(
+        ["day", "course_id", "teacher_id", "total_amount", "payment_count"], rows
+    ))
+    db.commit()
+    return db.query(models.RevenueDaily).count()
+
+
+def totals(db):
+    total, count = db.query(
+        func.coalesce(func.sum(models.RevenueDaily.total_amount), 0),
+        func.coalesce(func.sum(models.RevenueDaily.payment_count), 0)
+    ).one()
+    return total, count
+
+
+def report(db, start=None, end=None):
+    rollup = models.RevenueDaily
+    filters = []
+    if start:
+        filters.append(rollup.day >= start)
+    if end:
+        filters.append(rollup.day <= end)
+
+    amount = func.sum(rollup.total_amount)
+    count = func.sum(rollup.payment_count)
+
+    by_day = db.query(rollup.day, amount, count).filter(*filters).group_by(rollup.day).order_by(rollup.day).all()
+
+    by_course = db.query(models.Course.course_id, models.Course.title, amount, count).join(
+        models.Course, models.Course.course_id == rollup.course_id
+    ).filter(*filters).group_by(models.Course.course_id, models.Course.title).order_by(amount.desc()).all()
+
+    by_teacher = db.query(models.User.user_id, models.User.fullname, amount, count).join(
+        models.User, models.User.user_id == rollup.teacher_id
+    ).filter(*filters).group_by(models.User.user_id, models.User.fullname).order_by(amount.desc()).all()
+
+    return {
+        "by_day": by_day,
+        "by_course": by_course,
+        "by_teacher": by_teacher,
+        "total": sum(row[1] or 0 for row in by_day),
+        "count": sum(row[2] or 0 for row in by_day),
+    }
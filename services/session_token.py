@@ -0,0 +1,45 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import config
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload):
+    return hmac.new(config.SECRET_KEY.encode("utf-8"), payload.encode("ascii"), hashlib.sha256).digest()
+
+
+def create_session_token(user_id, role, profile_id=None, max_age=None):
+    claims = {
+        "uid": user_id,
+        "role": role,
+        "pid": profile_id,
+        "exp": int(time.time()) + (max_age or config.SESSION_MAX_AGE),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_b64encode(_sign(payload))}"
+
+
+def read_session_token(token):
+    if not token or token.count(".") != 1:
+        return None
+    payload, signature = token.split(".")
+    try:
+        if not hmac.compare_digest(_b64decode(signature), _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims
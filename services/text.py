@@ -0,0 +1,14 @@
+import re
+import unicodedata
+
+_WORDS = re.compile(r"\w+")
+
+
+def fold_text(text):
+    decomposed = unicodedata.normalize("NFD", (text or "").replace("đ", "d").replace("Đ", "D"))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def words(text):
+    return _WORDS.findall(fold_text(text))
@@ -0,0 +1,138 @@
+import re
+
+from sqlalchemy import and_, delete, func, insert, select
+
+from services.cache import TTLCache
+from services.text import fold_text, words
+import config
+import models
+
+PREFIX_LENGTHS = (1, 2)
+GRAM = 3
+MAX_GRAMS = 2
+
+_counts = TTLCache(config.USER_SEARCH_STATS_TTL, 50000)
+
+
+def _grams(word):
+    return {word[i:i + GRAM] for i in range(len(word) - GRAM + 1)}
+
+
+def split_words(text):
+    return words((text or "").replace("_", " "))
+
+
+def _terms(fullname, email):
+    return split_words(f"{fullname or ''} {email or ''}")
+
+
+def index_tokens(fullname, email):
+    tokens = set()
+    for word in _terms(fullname, email):
+        tokens.update("^" + word[:n] for n in PREFIX_LENGTHS if len(word) >= n)
+        tokens.update(_grams(word))
+    return {token[:32] for token in tokens}
+
+
+def query_tokens(q):
+    prefixes, grams = set(), set()
+    for word in split_words(q):
+        if len(word) >= GRAM:
+            grams.update(_grams(word))
+        else:
+            prefixes.add("^" + word)
+    return prefixes, grams
+
+
+def token_counts(db, tokens):
+    counts = {token: _counts.get(token) for token in tokens}
+    missing = [token for token, count in counts.items() if count is None]
+    if missing:
+        found = dict(db.query(models.UserSearchToken.token, func.count()).filter(
+            models.UserSearchToken.token.in_(missing)
+        ).group_by(models.UserSearchToken.token).all())
+        for token in missing:
+            counts[token] = found.get(token, 0)
+            _counts.set(token, counts[token])
+    return counts
+
+
+def selective_tokens(db, q):
+    prefixes, grams = query_tokens(q)
+    if len(grams) > MAX_GRAMS:
+        counts = token_counts(db, grams)
+        grams = set(sorted(grams, key=lambda token: (counts[token], token))[:MAX_GRAMS])
+    return prefixes | grams
+
+
+def search_text(fullname, email):
+    return fold_text(f"{fullname or ''} {email or ''}")
+
+
+def _token_rows(user):
+    return [{"user_id": user.user_id, "token": token, "role": user.role}
+            for token in index_tokens(user.fullname, user.email)]
+
+
+def index_user(db, user):
+    user.search_text = search_text(user.fullname, user.email)
+    db.flush()
+    db.execute(delete(models.UserSearchToken).where(models.UserSearchToken.user_id == user.user_id))
+    rows = _token_rows(user)
+    if rows:
+        db.execute(insert(models.UserSearchToken), rows)
+
+
+def remove_user(db, user_id):
+    db.execute(delete(models.UserSearchToken).where(models.UserSearchToken.user_id == user_id))
+
+
+def matching_user_ids(db, q, role=None):
+    tokens = selective_tokens(db, q)
+    if not tokens:
+        return None
+    conditions = [models.UserSearchToken.token.in_(tokens)]
+    if role:
+        conditions.append(models.UserSearchToken.role == role)
+    return (
+        select(models.UserSearchToken.user_id)
+        .where(and_(*conditions))
+        .group_by(models.UserSearchToken.user_id)
+        .having(func.count(models.UserSearchToken.token) == len(tokens))
+    )
+
+
+def filter_users(query, q, role=None):
+    candidates = matching_user_ids(query.session, q, role)
+    if candidates is None:
+        return query
+    query = query.filter(models.User.user_id.in_(candidates))
+    for word in split_words(q):
+        query = query.filter(models.User.search_text.like(f"%{_escape_like(word)}%", escape="\\"))
+    return query
+
+
+def _escape_like(value):
+    return re.sub(r"([\\%_])", r"\\\1", value)
+
+
+def rebuild(db, batch_size=500):
+    db.execute(delete(models.UserSearchToken))
+    last_id = 0
+    count = 0
+    while True:
+        users = db.query(models.User).filter(models.User.user_id > last_id).order_by(models.User.user_id).limit(batch_size).all()
+        if not users:
+            break
+        rows = []
+        for user in users:
+            user.search_text = search_text(user.fullname, user.email)
+            rows.extend(_token_rows(user))
+        db.flush()
+        if rows:
+            db.execute(insert(models.UserSearchToken), rows)
+        last_id = users[-1].user_id
+        count += len(users)
+        db.commit()
+    db.commit()
+    return count
@@ -0,0 +1,27 @@
+import jinja2
+from fastapi.templating import Jinja2Templates
+
+import config
+
+
+def _bytecode_cache():
+    if not config.TEMPLATE_BYTECODE_CACHE:
+        return None
+    return jinja2.FileSystemBytecodeCache(config.TEMPLATE_CACHE_DIR or None)
+
+
+env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(config.TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=config.TEMPLATE_AUTO_RELOAD,
+    bytecode_cache=_bytecode_cache(),
+)
+
+templates = Jinja2Templates(env=env)
+
+
+def precompile():
+    names = env.list_templates(filter_func=lambda name: name.endswith(".html"))
+    for name in names:
+        env.get_template(name)
+    return len(names)